@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
-from utils.db_connection import get_connection
+from utils.db_connection import get_connection, pool_stats
+from utils.change_listener import data_version
+from utils.counters import get_counters
 from sqlalchemy import text
 
 # Page Config
@@ -40,31 +42,16 @@ st.sidebar.page_link("pages/3_top_stats.py", label="📊 Top Stats", icon="📊"
 st.sidebar.page_link("pages/curd_operations.py", label="🛠️ CRUD Operations", icon="🛠️")
 st.sidebar.markdown("---")
 
-# Quick Stats in Sidebar
+# Quick Stats in Sidebar (trigger-maintained counters, see dashboard_counters in db.sql)
 def get_quick_stats():
-    conn = get_connection()
-    if not conn:
-        return None, None, None
-    
     try:
-        matches_result = conn.execute(text("SELECT COUNT(*) FROM matches")).fetchone()
-        total_matches = matches_result[0] if matches_result else 0
-        
-        players_result = conn.execute(text("SELECT COUNT(*) FROM players")).fetchone()
-        total_players = players_result[0] if players_result else 0
-        
-        active_result = conn.execute(text("""
-            SELECT COUNT(DISTINCT match_id) FROM match_scores 
-            WHERE runs > 0
-        """)).fetchone()
-        active_matches = active_result[0] if active_result else 0
-        
-        return total_matches, total_players, active_matches
+        counters = get_counters("total_matches", "total_players", "active_matches")
+        return counters["total_matches"], counters["total_players"], counters["active_matches"]
+    except ConnectionError:
+        return None, None, None
     except Exception as e:
         st.sidebar.error(f"Error fetching stats: {e}")
         return 0, 0, 0
-    finally:
-        conn.close()
 
 matches, players, active = get_quick_stats()
 if matches is not None:
@@ -73,6 +60,13 @@ if matches is not None:
     st.sidebar.metric("Total Players", players)
     st.sidebar.metric("Active Matches", active)
 
+with st.sidebar.expander("🔌 Connection Pool"):
+    stats = pool_stats()
+    st.metric("Checkouts", stats["checkouts"])
+    st.metric("Avg / Max Wait", f"{stats['avg_wait_ms']} / {stats['max_wait_ms']} ms")
+    st.caption(f"{stats['checked_out']} in use · {stats['idle']} idle · "
+               f"{stats['overflow']} overflow · {stats['new_connections']} opened · {stats['failures']} failed")
+
 # Main Header Only (removed feature cards)
 st.markdown("""
 <div class="main-header">
@@ -84,30 +78,32 @@ st.markdown("""
 # Recent Activity Section
 st.markdown("### 📈 Recent Activity")
 
-def get_recent_matches():
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_recent_matches(version):
     conn = get_connection()
     if not conn:
-        return pd.DataFrame()
+        raise ConnectionError("DB connection failed")
     
     try:
         query = """
-        SELECT 
-            m.match_description,
-            m.match_date,
-            COUNT(ms.match_id) as teams_with_scores
-        FROM matches m
-        LEFT JOIN match_scores ms ON m.match_id = ms.match_id
-        GROUP BY m.match_id, m.match_description, m.match_date
-        ORDER BY m.match_date DESC
+        SELECT match_description, match_date, teams_with_scores
+        FROM match_summary
+        ORDER BY match_date DESC, match_id DESC
         LIMIT 5
         """
         df = pd.read_sql(query, conn)
         return df
+    finally:
+        conn.close()
+
+def get_recent_matches():
+    try:
+        return load_recent_matches(data_version("match_summary"))
+    except ConnectionError:
+        return pd.DataFrame()
     except Exception as e:
         st.error(f"Error fetching recent matches: {e}")
         return pd.DataFrame()
-    finally:
-        conn.close()
 
 recent_df = get_recent_matches()
 if not recent_df.empty:
@@ -121,7 +117,7 @@ col1, col2, col3 = st.columns(3)
 
 with col1:
     if st.button("🔄 Refresh Data", use_container_width=True):
-        st.info("To refresh data, run: `python etl_load.py`")
+        st.info("To refresh data once, run: `python etl_load.py` — or keep it fresh with `python etl_load.py --daemon`")
 
 with col2:
     if st.button("📊 View Live Matches", use_container_width=True):
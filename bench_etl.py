@@ -0,0 +1,166 @@
+"""Throughput benchmark for the etl_load.py load path with regression tracking.
+
+Every size runs in its own subprocess against a scratch Postgres database
+(BENCH_DATABASE_URL), so peak RSS and the key caches are measured cold:
+
+    BENCH_DATABASE_URL=postgresql+psycopg2://postgres@localhost/cricbuzz_bench \\
+        python bench_etl.py --setup --sizes 100,1000,10000,100000
+
+Results are appended to a JSON history file and compared with the median of
+the last few accepted runs; the exit status is 1 when any metric regressed
+past its threshold.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+HISTORY_FILE = "bench_history.json"
+ETL_TABLES = ["score_snapshots", "match_scores", "etl_fingerprints", "matches", "venues", "teams"]
+
+# metric -> (direction, allowed relative change)
+THRESHOLDS = {
+    "matches_per_s": ("higher", 0.10),
+    "txn_seconds": ("lower", 0.15),
+    "statements": ("lower", 0.0),
+    "peak_rss_mb": ("lower", 0.20),
+}
+
+
+def run_single(size, database_url):
+    """Load one synthetic payload of `size` matches and return its metrics."""
+    from sqlalchemy import create_engine, event, text
+    from mock_cricbuzz import build_world, live_payload
+    from etl_load import transform, load
+
+    engine = create_engine(database_url)
+    statements = {"count": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*_):
+        statements["count"] += 1
+
+    payload = live_payload(build_world(series=max(1, size // 50), matches=size, players=10))
+    with engine.connect() as conn:
+        conn.execute(text(f"TRUNCATE {', '.join(ETL_TABLES)} RESTART IDENTITY CASCADE"))
+        conn.commit()
+        statements["count"] = 0
+
+        start = time.perf_counter()
+        records = list(transform(payload))
+        txn_start = time.perf_counter()
+        load(conn, records)
+        conn.commit()
+        end = time.perf_counter()
+
+    return {
+        "matches": len(records),
+        "matches_per_s": round(len(records) / (end - start), 1),
+        "txn_seconds": round(end - txn_start, 4),
+        "statements": statements["count"],
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def setup_schema(database_url):
+    from sqlalchemy import create_engine
+    engine = create_engine(database_url)
+    with open("db.sql") as f, engine.connect() as conn:
+        cursor = conn.connection.cursor()
+        cursor.execute(f.read())
+        conn.commit()
+    print("🧱 Schema created from db.sql")
+
+
+def baseline(history, size, window):
+    runs = [r["results"][size] for r in history if not r.get("regressed") and size in r["results"]][-window:]
+    if not runs:
+        return None
+    return {m: statistics.median(r[m] for r in runs) for m in THRESHOLDS}
+
+
+def regressions(metrics, base):
+    found = []
+    for metric, (direction, allowed) in THRESHOLDS.items():
+        old, new = base[metric], metrics[metric]
+        if not old:
+            continue
+        change = (new - old) / old
+        if (direction == "higher" and change < -allowed) or (direction == "lower" and change > allowed):
+            found.append(f"{metric} {old} → {new} ({change:+.1%})")
+    return found
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ETL load path")
+    parser.add_argument("--sizes", default="100,1000,10000,100000", help="comma-separated match counts")
+    parser.add_argument("--history", default=HISTORY_FILE, help="JSON history file")
+    parser.add_argument("--window", type=int, default=5, help="accepted runs in the baseline median")
+    parser.add_argument("--setup", action="store_true", help="create the schema from db.sql first")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    database_url = os.getenv("BENCH_DATABASE_URL")
+    if not database_url:
+        sys.exit("❌ Set BENCH_DATABASE_URL to a scratch database; the ETL tables are truncated.")
+
+    if args.single:
+        print(json.dumps(run_single(args.single, database_url)))
+        return
+
+    if args.setup:
+        setup_schema(database_url)
+
+    history = []
+    if os.path.exists(args.history):
+        with open(args.history) as f:
+            history = json.load(f)
+
+    results, failed = {}, []
+    for size in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+        out = subprocess.run(
+            [sys.executable, __file__, "--single", size],
+            capture_output=True, text=True, check=True,
+        )
+        metrics = json.loads(out.stdout.strip().splitlines()[-1])
+        results[size] = metrics
+
+        base = baseline(history, size, args.window)
+        problems = regressions(metrics, base) if base else []
+        failed += [f"{size} matches: {p}" for p in problems]
+        print(f"{'❌' if problems else '✅'} {int(size):>7} matches: {metrics['matches_per_s']:>10.1f} matches/s, "
+              f"{metrics['statements']:>4} statements, {metrics['txn_seconds']:.3f}s txn, "
+              f"{metrics['peak_rss_mb']:.0f} MB peak RSS")
+
+    history.append({
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "results": results,
+        "regressed": bool(failed),
+    })
+    with open(args.history, "w") as f:
+        json.dump(history, f, indent=2)
+
+    if failed:
+        print("\n⚠️ Regressions against the baseline:")
+        for line in failed:
+            print(f"   {line}")
+        sys.exit(1)
+    print("\n🎉 No regressions.")
+
+
+if __name__ == "__main__":
+    main()
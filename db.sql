@@ -79,3 +79,285 @@ CREATE TABLE bowling_stats (
     matches INT DEFAULT 0,
     UNIQUE (player_id, format, stat_type)
 );
+
+-- -------------------
+-- ETL Fingerprints
+-- -------------------
+CREATE TABLE etl_fingerprints (
+    match_id BIGINT PRIMARY KEY REFERENCES matches(match_id) ON DELETE CASCADE,
+    fingerprint TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- -------------------
+-- Score Snapshots
+-- -------------------
+-- Append-only progression of every innings, one partition per month
+-- (score_snapshots_YYYY_MM, created by the ETL on demand). Overs are stored
+-- as integer balls. Worm / run-rate charts read one match with a single
+-- range scan of idx_score_snapshots_progress.
+CREATE TABLE score_snapshots (
+    match_id BIGINT NOT NULL,
+    team_id INT NOT NULL,
+    innings SMALLINT NOT NULL,
+    captured_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    balls SMALLINT NOT NULL,
+    runs SMALLINT NOT NULL,
+    wickets SMALLINT NOT NULL
+) PARTITION BY RANGE (captured_at);
+
+CREATE INDEX idx_score_snapshots_progress
+    ON score_snapshots (match_id, team_id, innings, balls) INCLUDE (runs, wickets, captured_at);
+
+-- -------------------
+-- Dashboard Counters
+-- -------------------
+-- Row counts for the sidebar quick stats, kept current by statement-level
+-- triggers so the pages read them with a primary-key lookup instead of
+-- scanning the tables. One row per counter keeps writers of different
+-- tables from queueing on the same row lock.
+CREATE TABLE dashboard_counters (
+    counter TEXT PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- "Active" matches are those with at least one innings under way; the
+-- partial index lets the delta trigger count a touched match's active rows
+-- without reading any other match
+CREATE INDEX idx_match_scores_active ON match_scores (match_id) WHERE runs > 0;
+
+CREATE OR REPLACE FUNCTION dashboard_counter_delta() RETURNS trigger AS $$
+DECLARE
+    delta BIGINT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT count(*) INTO delta FROM new_rows;
+    ELSE
+        SELECT -count(*) INTO delta FROM old_rows;
+    END IF;
+    IF delta <> 0 THEN
+        UPDATE dashboard_counters SET value = value + delta, updated_at = now()
+        WHERE counter = TG_ARGV[0];
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION dashboard_counter_reset() RETURNS trigger AS $$
+BEGIN
+    UPDATE dashboard_counters SET value = 0, updated_at = now() WHERE counter = TG_ARGV[0];
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Matches that became active minus those that stopped being active, given
+-- the net change in active score rows a statement made to each match it
+-- touched: the match was active before the statement if it still is once
+-- those rows are taken back out
+CREATE OR REPLACE FUNCTION active_matches_delta(match_ids BIGINT[], row_deltas BIGINT[]) RETURNS BIGINT AS $$
+    SELECT COALESCE(sum((t.now_rows > 0)::INT - (t.now_rows - t.d > 0)::INT), 0)
+    FROM (
+        SELECT c.match_id, sum(c.d) AS d,
+               (SELECT count(*) FROM match_scores s WHERE s.match_id = c.match_id AND s.runs > 0) AS now_rows
+        FROM unnest(match_ids, row_deltas) AS c(match_id, d)
+        GROUP BY c.match_id
+    ) t;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION dashboard_active_matches() RETURNS trigger AS $$
+DECLARE
+    ids BIGINT[];
+    deltas BIGINT[];
+    delta BIGINT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(match_id), array_agg(1::BIGINT) INTO ids, deltas
+        FROM new_rows WHERE runs > 0 AND match_id IS NOT NULL;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(match_id), array_agg(-1::BIGINT) INTO ids, deltas
+        FROM old_rows WHERE runs > 0 AND match_id IS NOT NULL;
+    ELSE
+        SELECT array_agg(match_id), array_agg(d) INTO ids, deltas FROM (
+            SELECT match_id, 1::BIGINT AS d FROM new_rows WHERE runs > 0 AND match_id IS NOT NULL
+            UNION ALL
+            SELECT match_id, -1::BIGINT FROM old_rows WHERE runs > 0 AND match_id IS NOT NULL
+        ) c;
+    END IF;
+    IF ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+    -- Two writers to one match would each count in their own snapshot and both apply
+    -- the same change. Lock the touched matches until commit, in hash order so writers
+    -- cannot deadlock; the count below then takes its snapshot after the other commits.
+    PERFORM pg_advisory_xact_lock('match_scores'::regclass::oid::INT, h)
+    FROM (SELECT DISTINCT hashint8(m) AS h FROM unnest(ids) AS m ORDER BY 1) locks;
+    delta := active_matches_delta(ids, deltas);
+    IF delta <> 0 THEN
+        UPDATE dashboard_counters SET value = value + delta, updated_at = now()
+        WHERE counter = 'active_matches';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t RECORD;
+BEGIN
+    FOR t IN SELECT * FROM (VALUES
+        ('matches', 'total_matches'),
+        ('players', 'total_players'),
+        ('batting_stats', 'batting_records'),
+        ('bowling_stats', 'bowling_records')
+    ) AS v(tbl, counter) LOOP
+        EXECUTE format(
+            'CREATE TRIGGER %1$I_count_insert AFTER INSERT ON %1$I REFERENCING NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION dashboard_counter_delta(%2$L)', t.tbl, t.counter);
+        EXECUTE format(
+            'CREATE TRIGGER %1$I_count_delete AFTER DELETE ON %1$I REFERENCING OLD TABLE AS old_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION dashboard_counter_delta(%2$L)', t.tbl, t.counter);
+        EXECUTE format(
+            'CREATE TRIGGER %1$I_count_truncate AFTER TRUNCATE ON %1$I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION dashboard_counter_reset(%2$L)', t.tbl, t.counter);
+    END LOOP;
+END;
+$$;
+
+-- Transition tables need one trigger per event and no column list
+CREATE TRIGGER match_scores_active_insert
+    AFTER INSERT ON match_scores REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_active_matches();
+CREATE TRIGGER match_scores_active_update
+    AFTER UPDATE ON match_scores REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_active_matches();
+CREATE TRIGGER match_scores_active_delete
+    AFTER DELETE ON match_scores REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_active_matches();
+CREATE TRIGGER match_scores_active_truncate
+    AFTER TRUNCATE ON match_scores
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_counter_reset('active_matches');
+
+-- Seed from the current contents so the schema can be applied to a loaded database
+INSERT INTO dashboard_counters (counter, value)
+SELECT 'total_matches', count(*) FROM matches
+UNION ALL SELECT 'total_players', count(*) FROM players
+UNION ALL SELECT 'batting_records', count(*) FROM batting_stats
+UNION ALL SELECT 'bowling_records', count(*) FROM bowling_stats
+UNION ALL SELECT 'active_matches', count(DISTINCT match_id) FROM match_scores WHERE runs > 0
+ON CONFLICT (counter) DO UPDATE SET value = EXCLUDED.value, updated_at = now();
+
+-- -------------------
+-- Match Summary
+-- -------------------
+-- One pre-joined row per match for the recent / live match lists, so the
+-- pages read the top N rows straight off idx_match_summary_date instead of
+-- joining and grouping every match. Team slots follow team_id order, the
+-- same order the score strings used. Kept current by refresh_match_summary(),
+-- which stamps every row it actually changes with the next change_seq so
+-- pollers can fetch just the rows changed since the value they last saw.
+CREATE SEQUENCE match_summary_change_seq;
+
+CREATE TABLE match_summary (
+    match_id BIGINT PRIMARY KEY REFERENCES matches(match_id) ON DELETE CASCADE,
+    match_description TEXT,
+    match_date DATE,
+    venue_name TEXT,
+    city TEXT,
+    team1_name TEXT,
+    team1_runs INT,
+    team1_wickets INT,
+    team1_overs NUMERIC(5,1),
+    team2_name TEXT,
+    team2_runs INT,
+    team2_wickets INT,
+    team2_overs NUMERIC(5,1),
+    teams_with_scores SMALLINT NOT NULL DEFAULT 0,
+    change_seq BIGINT NOT NULL DEFAULT nextval('match_summary_change_seq'),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX idx_match_summary_date ON match_summary (match_date DESC, match_id DESC);
+CREATE INDEX idx_match_summary_scored ON match_summary (match_date DESC, match_id DESC)
+    INCLUDE (change_seq) WHERE teams_with_scores > 0;
+CREATE INDEX idx_match_summary_change_seq ON match_summary (change_seq);
+
+-- Rebuild the summary rows of the given matches (all matches when ids is NULL).
+-- change_seq is taken at write time but read by pollers as a commit-ordered
+-- cursor, so refreshes are serialised until commit: a transaction-level
+-- advisory lock makes seqs become visible in the order they were assigned.
+CREATE OR REPLACE FUNCTION refresh_match_summary(ids BIGINT[]) RETURNS INT AS $$
+    SELECT pg_advisory_xact_lock('match_summary_change_seq'::regclass::oid::bigint);
+
+    WITH scored AS (
+        SELECT s.match_id, t.team_name, s.runs, s.wickets, s.overs,
+               row_number() OVER (PARTITION BY s.match_id ORDER BY s.team_id) AS slot,
+               count(*) OVER (PARTITION BY s.match_id) AS teams_with_scores
+        FROM match_scores s
+        JOIN teams t ON t.team_id = s.team_id
+        WHERE ids IS NULL OR s.match_id = ANY(ids)
+    ),
+    upserted AS (
+        INSERT INTO match_summary AS ms (
+            match_id, match_description, match_date, venue_name, city,
+            team1_name, team1_runs, team1_wickets, team1_overs,
+            team2_name, team2_runs, team2_wickets, team2_overs,
+            teams_with_scores, updated_at
+        )
+        SELECT m.match_id, m.match_description, m.match_date, v.venue_name, v.city,
+               s1.team_name, s1.runs, s1.wickets, s1.overs,
+               s2.team_name, s2.runs, s2.wickets, s2.overs,
+               COALESCE(s1.teams_with_scores, 0), now()
+        FROM matches m
+        LEFT JOIN venues v ON v.venue_id = m.venue_id
+        LEFT JOIN scored s1 ON s1.match_id = m.match_id AND s1.slot = 1
+        LEFT JOIN scored s2 ON s2.match_id = m.match_id AND s2.slot = 2
+        WHERE ids IS NULL OR m.match_id = ANY(ids)
+        ON CONFLICT (match_id) DO UPDATE SET
+            match_description = EXCLUDED.match_description,
+            match_date = EXCLUDED.match_date,
+            venue_name = EXCLUDED.venue_name,
+            city = EXCLUDED.city,
+            team1_name = EXCLUDED.team1_name,
+            team1_runs = EXCLUDED.team1_runs,
+            team1_wickets = EXCLUDED.team1_wickets,
+            team1_overs = EXCLUDED.team1_overs,
+            team2_name = EXCLUDED.team2_name,
+            team2_runs = EXCLUDED.team2_runs,
+            team2_wickets = EXCLUDED.team2_wickets,
+            team2_overs = EXCLUDED.team2_overs,
+            teams_with_scores = EXCLUDED.teams_with_scores,
+            change_seq = nextval('match_summary_change_seq'),
+            updated_at = EXCLUDED.updated_at
+        -- Leave untouched rows alone so re-refreshing a match costs no write
+        WHERE (ms.match_description, ms.match_date, ms.venue_name, ms.city,
+               ms.team1_name, ms.team1_runs, ms.team1_wickets, ms.team1_overs,
+               ms.team2_name, ms.team2_runs, ms.team2_wickets, ms.team2_overs, ms.teams_with_scores)
+              IS DISTINCT FROM
+              (EXCLUDED.match_description, EXCLUDED.match_date, EXCLUDED.venue_name, EXCLUDED.city,
+               EXCLUDED.team1_name, EXCLUDED.team1_runs, EXCLUDED.team1_wickets, EXCLUDED.team1_overs,
+               EXCLUDED.team2_name, EXCLUDED.team2_runs, EXCLUDED.team2_wickets, EXCLUDED.team2_overs,
+               EXCLUDED.teams_with_scores)
+        RETURNING 1
+    )
+    SELECT count(*)::INT FROM upserted;
+$$ LANGUAGE sql;
+
+SELECT refresh_match_summary(NULL);
+
+-- -------------------
+-- Leaderboards
+-- -------------------
+-- Full Cricbuzz leaderboards, one row per (format, stat_type), written by
+-- prefetch_leaderboards.py so the top-stats page reads them with a primary
+-- key lookup instead of waiting on the API.
+CREATE TABLE leaderboards (
+    format TEXT NOT NULL,
+    stat_type TEXT NOT NULL,
+    category TEXT NOT NULL,
+    label TEXT NOT NULL,
+    headers JSONB NOT NULL,
+    rows JSONB NOT NULL,
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (format, stat_type)
+);
@@ -1,143 +1,593 @@
-import requests
 import os
+import time
+import json
+import hashlib
+import argparse
+import signal
+import logging
+import threading
+from functools import partial
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from sqlalchemy import text
 from utils.db_connection import get_connection
+from utils.key_cache import team_ids as team_cache, venue_ids as venue_cache, start_invalidation_listener
+from utils.async_fetcher import MATCH_FEEDS, fetch_all
+from utils.cricbuzz_api import api_client
+from utils.payload_archive import ARCHIVE_DIR, archive_payload, iter_archive_lines
+from utils.pipeline import run_pipeline
+from utils.change_events import notify_change
+from etl_scorecards import load_scorecards
+from utils.analytics_views import refresh_views
 
 # Load environment variables
 load_dotenv()
-API_KEY = os.getenv("RAPIDAPI_KEY")
 
-url = "https://cricbuzz-cricket.p.rapidapi.com/matches/v1/live"
-headers = {
-    "x-rapidapi-host": "cricbuzz-cricket.p.rapidapi.com",
-    "x-rapidapi-key": API_KEY
-}
+log = logging.getLogger("etl")
 
-def etl_load():
-    conn = get_connection()
-    if not conn:
-        print("❌ DB connection failed.")
-        return
+# Daemon poll interval bounds in seconds
+MIN_INTERVAL = int(os.getenv("ETL_MIN_INTERVAL", "15"))
+MAX_INTERVAL = int(os.getenv("ETL_MAX_INTERVAL", "600"))
 
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        print("❌ API Error:", response.text)
-        return
+# Shortest gap between materialized view refreshes in the daemon (s)
+VIEW_REFRESH_INTERVAL = int(os.getenv("ETL_VIEW_REFRESH_INTERVAL", "300"))
 
-    data = response.json()
+# Matches collected per bulk write
+BATCH_SIZE = int(os.getenv("ETL_BATCH_SIZE", "5000"))
+
+# matchInfo.state values that mean play can change the score soon
+LIVE_STATES = {"In Progress", "Innings Break", "Toss", "Lunch", "Tea", "Drinks", "Delay", "Rain"}
+
+
+def fingerprint(match):
+    """Stable hash of the matchInfo + matchScore subtree of one match."""
+    subtree = {"matchInfo": match.get("matchInfo", {}), "matchScore": match.get("matchScore", {})}
+    encoded = json.dumps(subtree, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def overs_to_balls(overs):
+    """12.3 overs -> 75 balls; the digit after the point counts balls, not tenths."""
+    whole, _, part = str(overs or 0).partition(".")
+    return int(whole or 0) * 6 + int(part[:1] or 0)
+
+
+def transform(data, fetched_at=None):
+    """Flatten a /matches/v1/live payload into one record per match.
 
+    fetched_at stamps the record's score snapshots; None means "now" at load time.
+    """
     for type_match in data.get("typeMatches", []):
         for series in type_match.get("seriesMatches", []):
             series_wrapper = series.get("seriesAdWrapper", {})
             for match in series_wrapper.get("matches", []):
                 match_info = match.get("matchInfo", {})
                 venue_info = match_info.get("venueInfo", {})
+                match_score = match.get("matchScore", {})
 
                 # ---------------- Teams ----------------
-                team_ids = {}
+                teams = {}
                 for team_key in ["team1", "team2"]:
                     team_name = match_info.get(team_key, {}).get("teamName", "")
-                    if not team_name:
-                        continue
-                    try:
-                        query = """
-                        INSERT INTO teams (team_name)
-                        VALUES (:team_name)
-                        ON CONFLICT (team_name) DO NOTHING
-                        RETURNING team_id
-                        """
-                        res = conn.execute(text(query), {"team_name": team_name}).fetchone()
-                        if res:
-                            team_ids[team_key] = res[0]
-                        else:
-                            query2 = "SELECT team_id FROM teams WHERE team_name=:team_name"
-                            team_ids[team_key] = conn.execute(text(query2), {"team_name": team_name}).fetchone()[0]
-                    except Exception as e:
-                        print(f"❌ Error inserting team {team_name}: {e}")
-                        conn.rollback()
+                    if team_name:
+                        teams[team_key] = team_name
 
                 # ---------------- Venue ----------------
-                venue_name = venue_info.get("ground", "")
-                city = venue_info.get("city", "")
-                country = "Unknown"
-                capacity = None
-                venue_id = None
-
-                if venue_name:
-                    try:
-                        query = """
-                        INSERT INTO venues (venue_name, city, country, capacity)
-                        VALUES (:venue_name, :city, :country, :capacity)
-                        ON CONFLICT (venue_name) DO NOTHING
-                        RETURNING venue_id
-                        """
-                        res = conn.execute(
-                            text(query),
-                            {"venue_name": venue_name, "city": city, "country": country, "capacity": capacity},
-                        ).fetchone()
-                        if res:
-                            venue_id = res[0]
-                        else:
-                            query2 = "SELECT venue_id FROM venues WHERE venue_name=:venue_name"
-                            venue_id = conn.execute(text(query2), {"venue_name": venue_name}).fetchone()[0]
-                    except Exception as e:
-                        print(f"❌ Error inserting venue {venue_name}: {e}")
-                        conn.rollback()
-
-                # ---------------- Match ----------------
-                match_id = match_info.get("matchId", 0)
-                match_desc = match_info.get("matchDesc", "")
-                series_name = match_info.get("seriesName", "")
-                match_date = match_info.get("startDate", None)  # or use CURRENT_DATE
-
-                if match_desc:
-                    try:
-                        query = """
-                        INSERT INTO matches (match_id, match_description, match_date, venue_id)
-                        VALUES (:mid, :desc, CURRENT_DATE, :vid)
-                        ON CONFLICT (match_id) DO NOTHING
-                        """
-                        conn.execute(
-                            text(query),
-                            {"mid": match_id, "desc": f"{series_name} - {match_desc}", "vid": venue_id},
-                        )
-                        print(f"✅ Inserted match: {series_name} - {match_desc}")
-                    except Exception as e:
-                        print(f"❌ Error inserting match {match_id}: {e}")
-                        conn.rollback()
+                venue = None
+                if venue_info.get("ground", ""):
+                    venue = {"venue_name": venue_info["ground"], "city": venue_info.get("city", "")}
 
                 # ---------------- Scores ----------------
-                match_score = match.get("matchScore", {})
-                for team_key, team_id in [("team1Score", team_ids.get("team1")), ("team2Score", team_ids.get("team2"))]:
-                    if team_key in match_score and team_id:
-                        innings = match_score[team_key].get("inngs1", {})
-                        runs = innings.get("runs")
-                        wickets = innings.get("wickets", 0)
-                        overs = innings.get("overs", 0.0)
-
-                        if runs is not None:
-                            try:
-                                query = """
-                                INSERT INTO match_scores (match_id, team_id, runs, wickets, overs)
-                                VALUES (:mid, :tid, :runs, :wickets, :overs)
-                                ON CONFLICT (match_id, team_id) DO UPDATE
-                                SET runs = EXCLUDED.runs,
-                                    wickets = EXCLUDED.wickets,
-                                    overs = EXCLUDED.overs
-                                """
-                                conn.execute(
-                                    text(query),
-                                    {"mid": match_id, "tid": team_id, "runs": runs, "wickets": wickets, "overs": overs},
-                                )
-                                print(f"   ➡️ Score updated: {runs}/{wickets} in {overs} overs")
-                            except Exception as e:
-                                print(f"❌ Error updating score for match {match_id}: {e}")
-                                conn.rollback()
-
-    conn.commit()
-    conn.close()
-    print("🎉 ETL completed successfully.")
+                scores = []
+                for team_key, score_key in [("team1", "team1Score"), ("team2", "team2Score")]:
+                    if score_key in match_score and team_key in teams:
+                        innings = match_score[score_key].get("inngs1", {})
+                        if innings.get("runs") is not None:
+                            scores.append({
+                                "team_name": teams[team_key],
+                                "runs": innings.get("runs"),
+                                "wickets": innings.get("wickets", 0),
+                                "overs": innings.get("overs", 0.0),
+                            })
+
+                # ---------------- Snapshots ----------------
+                snapshots = []
+                for team_key, score_key in [("team1", "team1Score"), ("team2", "team2Score")]:
+                    if team_key not in teams:
+                        continue
+                    for inngs_key, innings in match_score.get(score_key, {}).items():
+                        if innings.get("runs") is None:
+                            continue
+                        snapshots.append({
+                            "team_name": teams[team_key],
+                            "innings": innings.get("inningsId") or int(inngs_key.replace("inngs", "") or 1),
+                            "balls": overs_to_balls(innings.get("overs")),
+                            "runs": innings.get("runs"),
+                            "wickets": innings.get("wickets", 0),
+                            "captured_at": fetched_at,
+                        })
+
+                yield {
+                    "match_id": match_info.get("matchId", 0),
+                    "state": match_info.get("state", ""),
+                    "match_desc": match_info.get("matchDesc", ""),
+                    "series_name": match_info.get("seriesName", ""),
+                    "teams": list(teams.values()),
+                    "venue": venue,
+                    "scores": scores,
+                    "snapshots": snapshots,
+                    "fingerprint": fingerprint(match),
+                }
+
+
+def drop_unchanged(conn, records):
+    """Split records into those whose fingerprint changed and a skipped count."""
+    ids = list({r["match_id"] for r in records})
+    if not ids:
+        return records, 0
+    known = dict(conn.execute(
+        text("SELECT match_id, fingerprint FROM etl_fingerprints WHERE match_id = ANY(:ids)"),
+        {"ids": ids},
+    ).fetchall())
+    changed = [r for r in records if known.get(r["match_id"]) != r["fingerprint"]]
+    return changed, len(records) - len(changed)
+
+
+def load(conn, records, force=False):
+    """Write a batch of match records with a fixed number of set-based statements.
+
+    Matches whose fingerprint is unchanged since the last load are skipped
+    unless force is set. Returns a dict of row, written and skipped counts
+    plus the ids of the matches written.
+    """
+    skipped = 0
+    if not force:
+        records, skipped = drop_unchanged(conn, records)
+
+    team_names = sorted({name for r in records for name in r["teams"]})
+    venues = {r["venue"]["venue_name"]: r["venue"] for r in records if r["venue"]}
+    rows = 0
+    changed = set()
+
+    # ---------------- Teams ----------------
+    new_teams = sum(team_cache.get(n) is None for n in team_names)
+    if new_teams:
+        rows += new_teams
+        changed.add("teams")
+    team_ids = team_cache.ensure(conn, team_names) if team_names else {}
+
+    # ---------------- Venues ----------------
+    venue_ids = venue_cache.resolve(conn, list(venues)) if venues else {}
+    new_venues = [n for n in venues if n not in venue_ids]
+    if new_venues:
+        res = conn.execute(
+            text("""
+            INSERT INTO venues (venue_name, city, country, capacity)
+            SELECT v.venue_name, v.city, 'Unknown', NULL
+            FROM unnest(CAST(:names AS text[]), CAST(:cities AS text[])) AS v(venue_name, city)
+            ON CONFLICT (venue_name) DO NOTHING
+            RETURNING venue_name, venue_id
+            """),
+            {"names": new_venues, "cities": [venues[n]["city"] for n in new_venues]},
+        ).fetchall()
+        for name, venue_id in res:
+            venue_cache.put(name, venue_id)
+        venue_ids.update(res)
+        venue_ids.update(venue_cache.resolve(conn, [n for n in new_venues if n not in venue_ids]))
+        rows += len(new_venues)
+        changed.add("venues")
+
+    # ---------------- Matches ----------------
+    matches = {}
+    for r in records:
+        if r["match_desc"]:
+            venue_name = r["venue"]["venue_name"] if r["venue"] else None
+            matches[r["match_id"]] = (f"{r['series_name']} - {r['match_desc']}", venue_ids.get(venue_name))
+
+    if matches:
+        mids = list(matches)
+        conn.execute(
+            text("""
+            INSERT INTO matches (match_id, match_description, match_date, venue_id)
+            SELECT m.mid, m.descr, CURRENT_DATE, m.vid
+            FROM unnest(CAST(:mids AS bigint[]), CAST(:descs AS text[]), CAST(:vids AS int[]))
+                 AS m(mid, descr, vid)
+            ON CONFLICT (match_id) DO NOTHING
+            """),
+            {"mids": mids, "descs": [matches[m][0] for m in mids], "vids": [matches[m][1] for m in mids]},
+        )
+        rows += len(mids)
+        changed.update(["matches", "etl_fingerprints"])
+
+    # ---------------- Scores ----------------
+    scores = {}
+    for r in records:
+        if r["match_id"] not in matches:
+            continue
+        for s in r["scores"]:
+            team_id = team_ids.get(s["team_name"])
+            if team_id:
+                scores[(r["match_id"], team_id)] = s
+
+    if scores:
+        keys = list(scores)
+        conn.execute(
+            text("""
+            INSERT INTO match_scores (match_id, team_id, runs, wickets, overs)
+            SELECT * FROM unnest(
+                CAST(:mids AS bigint[]), CAST(:tids AS int[]), CAST(:runs AS int[]),
+                CAST(:wickets AS int[]), CAST(:overs AS numeric[])
+            )
+            ON CONFLICT (match_id, team_id) DO UPDATE
+            SET runs = EXCLUDED.runs,
+                wickets = EXCLUDED.wickets,
+                overs = EXCLUDED.overs
+            """),
+            {
+                "mids": [k[0] for k in keys],
+                "tids": [k[1] for k in keys],
+                "runs": [scores[k]["runs"] for k in keys],
+                "wickets": [scores[k]["wickets"] for k in keys],
+                "overs": [scores[k]["overs"] for k in keys],
+            },
+        )
+        rows += len(keys)
+        changed.add("match_scores")
+
+    # ---------------- Snapshots ----------------
+    snapshots = [
+        (r["match_id"], team_ids[s["team_name"]], s)
+        for r in records if r["match_id"] in matches
+        for s in r["snapshots"] if s["team_name"] in team_ids
+    ]
+    partitions = []
+    if snapshots:
+        partitions = ensure_snapshot_partitions(conn, {s["captured_at"] for _, _, s in snapshots})
+        conn.execute(
+            text("""
+            INSERT INTO score_snapshots (match_id, team_id, innings, captured_at, balls, runs, wickets)
+            SELECT s.mid, s.tid, s.innings, COALESCE(s.captured_at, now()), s.balls, s.runs, s.wickets
+            FROM unnest(
+                CAST(:mids AS bigint[]), CAST(:tids AS int[]), CAST(:innings AS smallint[]),
+                CAST(:captured AS timestamptz[]), CAST(:balls AS smallint[]),
+                CAST(:runs AS smallint[]), CAST(:wickets AS smallint[])
+            ) AS s(mid, tid, innings, captured_at, balls, runs, wickets)
+            """),
+            {
+                "mids": [m for m, _, _ in snapshots],
+                "tids": [t for _, t, _ in snapshots],
+                "innings": [s["innings"] for _, _, s in snapshots],
+                "captured": [s["captured_at"] for _, _, s in snapshots],
+                "balls": [s["balls"] for _, _, s in snapshots],
+                "runs": [s["runs"] for _, _, s in snapshots],
+                "wickets": [s["wickets"] for _, _, s in snapshots],
+            },
+        )
+        rows += len(snapshots)
+        changed.add("score_snapshots")
+
+    # ---------------- Match summary ----------------
+    if matches:
+        refreshed = conn.execute(
+            text("SELECT refresh_match_summary(CAST(:mids AS bigint[]))"), {"mids": list(matches)}
+        ).scalar()
+        if refreshed:
+            changed.add("match_summary")
+
+    # ---------------- Fingerprints ----------------
+    if matches:
+        fps = {r["match_id"]: r["fingerprint"] for r in records if r["match_id"] in matches}
+        mids = list(fps)
+        conn.execute(
+            text("""
+            INSERT INTO etl_fingerprints (match_id, fingerprint, updated_at)
+            SELECT f.mid, f.fp, CURRENT_TIMESTAMP
+            FROM unnest(CAST(:mids AS bigint[]), CAST(:fps AS text[])) AS f(mid, fp)
+            ON CONFLICT (match_id) DO UPDATE
+            SET fingerprint = EXCLUDED.fingerprint,
+                updated_at = EXCLUDED.updated_at
+            """),
+            {"mids": mids, "fps": [fps[m] for m in mids]},
+        )
+
+    # Delivered to the dashboard's listener when the batch commits
+    if changed:
+        notify_change(conn, changed, matches)
+
+    log.info("✅ Loaded %d matches, %d scores, %d teams, %d venues (%d unchanged matches skipped)",
+             len(matches), len(scores), len(team_names), len(venues), skipped)
+    return {"rows": rows, "written": len(matches), "skipped": skipped, "match_ids": list(matches),
+            "partitions": partitions}
+
+
+# Months whose partition exists; only filled after the creating transaction
+# committed, since a rolled-back batch takes its new partitions with it
+_snapshot_partitions = set()
+
+
+def ensure_snapshot_partitions(conn, timestamps):
+    """Create the monthly score_snapshots partitions the given timestamps fall into.
+
+    Months are UTC and so are the partition bounds. Returns the months
+    created, for commit_snapshot_partitions() once the batch commits.
+    """
+    months = {(ts or datetime.now(timezone.utc)).astimezone(timezone.utc).strftime("%Y-%m") for ts in timestamps}
+    created = sorted(months - _snapshot_partitions)
+    for month in created:
+        year, mon = map(int, month.split("-"))
+        upper = f"{year + mon // 12}-{mon % 12 + 1:02d}-01"
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS score_snapshots_{year}_{mon:02d} PARTITION OF score_snapshots "
+            f"FOR VALUES FROM ('{month}-01 00:00:00+00:00') TO ('{upper} 00:00:00+00:00')"
+        ))
+    return created
+
+
+def commit_snapshot_partitions(months):
+    _snapshot_partitions.update(months)
+
+
+def downsample_snapshots(older_than_days):
+    """Retention job: keep only the last snapshot of every over once snapshots are old."""
+    conn = get_connection(role="etl")
+    if not conn:
+        log.error("❌ DB connection failed.")
+        return
+    try:
+        deleted = conn.execute(
+            text("""
+            DELETE FROM score_snapshots s
+            WHERE s.captured_at < now() - make_interval(days => :days)
+              AND EXISTS (
+                  SELECT 1 FROM score_snapshots n
+                  WHERE n.match_id = s.match_id
+                    AND n.team_id = s.team_id
+                    AND n.innings = s.innings
+                    -- Over N holds balls 6N-5..6N, so the over-completion row closes its own over
+                    AND n.balls BETWEEN (s.balls + 5) / 6 * 6 - 5 AND (s.balls + 5) / 6 * 6
+                    AND n.captured_at < now() - make_interval(days => :days)
+                    AND (n.balls, n.captured_at) > (s.balls, s.captured_at)
+              )
+            """),
+            {"days": older_than_days},
+        ).rowcount
+        conn.commit()
+        log.info("🧹 Downsampled score snapshots older than %d days: %d rows removed", older_than_days, deleted)
+    except Exception as e:
+        log.error("❌ Downsampling failed: %s", e)
+        conn.rollback()
+    finally:
+        conn.close()
+
+
+def fetch_live(client, validators):
+    """GET the live feed, revalidating with the ETag/Last-Modified of the previous poll.
+
+    Returns the decoded payload, or None when the API answers 304 Not Modified.
+    """
+    conditional = {}
+    if validators.get("etag"):
+        conditional["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        conditional["If-Modified-Since"] = validators["last_modified"]
+
+    # Rate limiting, retries and the circuit breaker live in the shared client
+    response = client.get(MATCH_FEEDS["live"], headers=conditional, not_modified_ok=True)
+    if response.status_code == 304:
+        return None
+
+    validators["etag"] = response.headers.get("ETag")
+    validators["last_modified"] = response.headers.get("Last-Modified")
+    data = response.json()
+    archive_payload(MATCH_FEEDS["live"], data)
+    return data
+
+
+def run_load(conn, records, force=False):
+    """Load one batch of records in a single transaction; returns stats or None on failure."""
+    start = time.perf_counter()
+    try:
+        stats = load(conn, records, force=force)
+        conn.commit()
+        commit_snapshot_partitions(stats["partitions"])
+    except Exception as e:
+        log.error("❌ Error loading payload: %s", e)
+        conn.rollback()
+        # Keys handed out inside the rolled-back transaction no longer exist
+        team_cache.invalidate()
+        venue_cache.invalidate()
+        return None
+
+    elapsed = time.perf_counter() - start
+    log.info("🎉 Batch committed: %d matches written, %d skipped, %d rows in %.3fs (%.0f rows/s)",
+             stats["written"], stats["skipped"], stats["rows"], elapsed,
+             stats["rows"] / elapsed if elapsed else 0)
+    return stats
+
+
+def fetch_feeds(feeds):
+    """Extract stage: fetch the match feeds concurrently and archive every response."""
+    for path, data in fetch_all(MATCH_FEEDS[f] for f in feeds).items():
+        if isinstance(data, Exception):
+            log.error("❌ API Error: %s", data)
+            continue
+        archive_payload(path, data)
+        yield data, datetime.now(timezone.utc)
+
+
+def decode_archive(lines, endpoint_prefix="/matches/"):
+    """Transform stage: decode archived JSON lines into (payload, fetched_at) pairs."""
+    for line in lines:
+        archived = json.loads(line)
+        if archived["endpoint"].startswith(endpoint_prefix):
+            yield archived["payload"], datetime.fromisoformat(archived["fetched_at"])
+
+
+def batch_records(payloads, batch_size=BATCH_SIZE, keep_first=False):
+    """Transform stage: build match records and group them into bulk-load batches.
+
+    One record is kept per match within a batch: the latest one, or the first
+    one when keep_first is set so that earlier feeds take precedence. When a
+    later record replaces a different earlier one, the earlier score
+    snapshots are carried over so no progression is lost.
+    """
+    records = {}
+    for data, fetched_at in payloads:
+        for record in transform(data, fetched_at):
+            previous = records.get(record["match_id"])
+            if previous is None:
+                records[record["match_id"]] = record
+            elif not keep_first and previous["fingerprint"] != record["fingerprint"]:
+                record["snapshots"] = previous["snapshots"] + record["snapshots"]
+                records[record["match_id"]] = record
+        if len(records) >= batch_size:
+            yield list(records.values())
+            records = {}
+    if records:
+        yield list(records.values())
+
+
+def etl_load(force=False, feeds=("live",), scorecards=False):
+    """Fetch the given match feeds concurrently and load them through the staged pipeline.
+
+    With scorecards set, the scorecards of every match written are loaded afterwards.
+    """
+    conn = get_connection(role="etl")
+    if not conn:
+        log.error("❌ DB connection failed.")
+        return
+
+    written = []
+
+    def sink(batch):
+        stats = run_load(conn, batch, force=force)
+        if stats:
+            written.extend(stats["match_ids"])
+
+    try:
+        run_pipeline(fetch_feeds(feeds), [partial(batch_records, keep_first=True)], sink)
+    except Exception as e:
+        log.error("❌ ETL failed: %s", e)
+    finally:
+        conn.close()
+
+    if scorecards:
+        load_scorecards(written)
+    refresh_views()
+
+
+def replay(root=ARCHIVE_DIR, force=False, batch_size=BATCH_SIZE):
+    """Rebuild the tables from archived match feeds without calling the API.
+
+    Reading, JSON decoding, record building and database writes run as
+    separate stages, so memory stays flat however large the archive is.
+    """
+    conn = get_connection(role="etl")
+    if not conn:
+        log.error("❌ DB connection failed.")
+        return
+
+    start = time.perf_counter()
+    try:
+        stats = run_pipeline(
+            iter_archive_lines(root),
+            [decode_archive, partial(batch_records, batch_size=batch_size)],
+            lambda batch: run_load(conn, batch, force=force),
+        )
+    except Exception as e:
+        log.error("❌ Replay failed: %s", e)
+        return
+    finally:
+        conn.close()
+    refresh_views()
+
+    payloads = stats[1].items
+    elapsed = time.perf_counter() - start
+    log.info("📼 Replayed %d payloads from %s in %.2fs (%.0f payloads/s)",
+             payloads, root, elapsed, payloads / elapsed if elapsed else 0)
+
+
+def run_daemon(min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, force=False):
+    """Poll the live feed until SIGTERM/SIGINT, keeping one API client and DB connection.
+
+    The interval drops to min_interval while any match is live and doubles
+    up to max_interval while nothing is.
+    """
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+
+    # Teams and venues renamed or deleted on the CRUD page must not resolve to stale keys
+    start_invalidation_listener(stop)
+
+    client = api_client()
+    validators = {}
+    conn = None
+    live = 0
+    interval = min_interval
+    last_refresh = 0.0
+    log.info("🔁 ETL daemon started (interval %d-%ds)", min_interval, max_interval)
+
+    while not stop.is_set():
+        try:
+            if conn is None:
+                conn = get_connection(role="etl")
+                if not conn:
+                    raise RuntimeError("DB connection failed")
+
+            data = fetch_live(client, validators)
+            if data is None:
+                log.info("⏸️ Feed not modified since last poll")
+            else:
+                records = list(transform(data, datetime.now(timezone.utc)))
+                live = sum(r["state"] in LIVE_STATES for r in records)
+                if run_load(conn, records, force=force) is None:
+                    # Start the next cycle on a fresh connection
+                    conn.close()
+                    conn = None
+            if time.monotonic() - last_refresh >= VIEW_REFRESH_INTERVAL:
+                refresh_views()
+                last_refresh = time.monotonic()
+        except Exception as e:
+            log.error("❌ Poll failed: %s", e)
+            live = 0
+            if conn is not None and conn.invalidated:
+                conn.close()
+                conn = None
+
+        interval = min_interval if live else min(interval * 2, max_interval)
+        log.info("⏱️ %d live matches, next poll in %ds", live, interval)
+        stop.wait(interval)
+
+    if conn is not None:
+        conn.close()
+    log.info("👋 ETL daemon stopped.")
 
 if __name__ == "__main__":
-    etl_load()
+    parser = argparse.ArgumentParser(description="Load Cricbuzz live matches into Postgres")
+    parser.add_argument("--force", action="store_true", help="rewrite matches even if their fingerprint is unchanged")
+    parser.add_argument("--daemon", action="store_true", help="keep polling the live feed until SIGTERM")
+    parser.add_argument("--min-interval", type=int, default=MIN_INTERVAL, help="poll interval while matches are live (s)")
+    parser.add_argument("--max-interval", type=int, default=MAX_INTERVAL, help="longest poll interval when idle (s)")
+    parser.add_argument("--feeds", default="live",
+                        help=f"comma-separated match feeds to load once ({', '.join(MATCH_FEEDS)})")
+    parser.add_argument("--scorecards", action="store_true",
+                        help="also load batting/bowling scorecards of the matches written")
+    parser.add_argument("--downsample-days", type=int, metavar="N",
+                        help="retention job: keep one score snapshot per over for snapshots older than N days")
+    parser.add_argument("--replay", metavar="DIR", help="rebuild from an archive directory instead of calling the API")
+    args = parser.parse_args()
+    feeds = [f.strip() for f in args.feeds.split(",") if f.strip()]
+    unknown = [f for f in feeds if f not in MATCH_FEEDS]
+    if unknown:
+        parser.error(f"unknown feed(s) {', '.join(unknown)}; choose from {', '.join(MATCH_FEEDS)}")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.downsample_days is not None:
+        downsample_snapshots(args.downsample_days)
+    elif args.replay:
+        replay(args.replay, force=args.force)
+    elif args.daemon:
+        run_daemon(args.min_interval, args.max_interval, force=args.force)
+    else:
+        etl_load(force=args.force, feeds=feeds, scorecards=args.scorecards)
@@ -0,0 +1,315 @@
+import io
+import csv
+import time
+import logging
+import argparse
+import threading
+from datetime import date, datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+from sqlalchemy import text
+from utils.db_connection import get_connection
+from utils.key_cache import analytics_team_ids as team_cache, analytics_player_ids as player_cache
+from utils.async_fetcher import fetch_scorecards, scorecard_path
+from utils.payload_archive import archive_payload
+from utils.analytics_views import refresh_views
+
+# Load environment variables
+load_dotenv()
+
+log = logging.getLogger("etl")
+
+BATTING_COLUMNS = [
+    "match_id", "player_id", "team_id", "innings_number", "batting_position", "runs_scored",
+    "balls_faced", "fours", "sixes", "strike_rate", "dismissal_type", "bowler_id",
+]
+BOWLING_COLUMNS = [
+    "match_id", "player_id", "team_id", "innings_number", "overs_bowled", "maidens",
+    "runs_conceded", "wickets_taken", "economy_rate",
+]
+
+# Cricbuzz matchFormat -> tables.sql matches.match_type
+MATCH_TYPES = {"TEST": "Test", "ODI": "ODI", "T20": "T20I"}
+# Cricbuzz state -> tables.sql matches.status; a match with a scorecard has started
+MATCH_STATUSES = {"Complete": "Completed", "Preview": "Scheduled", "Upcoming": "Scheduled"}
+
+
+def _ordered(entries, prefix):
+    """bat_1, bat_2, ... in batting order (the API keys are not zero padded)."""
+    return sorted(entries.items(), key=lambda kv: int(kv[0].replace(prefix, "") or 0))
+
+
+def parse_scorecard(data):
+    """Split a /mcenter/v1/{id}/scard payload into batting and bowling rows keyed by Cricbuzz player ids."""
+    batting, bowling = [], []
+    for innings in data.get("scoreCard", []):
+        innings_number = innings.get("inningsId", 1)
+        bat_team = innings.get("batTeamDetails", {})
+        bowl_team = innings.get("bowlTeamDetails", {})
+        bowlers = bowl_team.get("bowlersData", {})
+
+        for position, (_, bat) in enumerate(_ordered(bat_team.get("batsmenData", {}), "bat_"), start=1):
+            # Players listed but yet to bat have neither balls nor a dismissal
+            if not bat.get("balls") and not bat.get("outDesc"):
+                continue
+            batting.append({
+                "player_id": bat.get("batId"),
+                "player": bat.get("batName"),
+                "team": bat_team.get("batTeamName"),
+                "innings_number": innings_number,
+                "batting_position": position,
+                "runs_scored": bat.get("runs", 0),
+                "balls_faced": bat.get("balls", 0),
+                "fours": bat.get("fours", 0),
+                "sixes": bat.get("sixes", 0),
+                "strike_rate": bat.get("strikeRate", 0),
+                "dismissal_type": (bat.get("wicketCode") or "").lower() or None,
+                "bowler_id": bat.get("bowlerId") or None,
+            })
+
+        for _, bowl in _ordered(bowlers, "bowl_"):
+            bowling.append({
+                "player_id": bowl.get("bowlerId"),
+                "player": bowl.get("bowlName"),
+                "team": bowl_team.get("bowlTeamName"),
+                "innings_number": innings_number,
+                "overs_bowled": bowl.get("overs", 0),
+                "maidens": bowl.get("maidens", 0),
+                "runs_conceded": bowl.get("runs", 0),
+                "wickets_taken": bowl.get("wickets", 0),
+                "economy_rate": bowl.get("economy", 0),
+            })
+    return batting, bowling
+
+
+def parse_match(data, match_id, details=None):
+    """The tables.sql matches row of a scorecard.
+
+    Reads the payload's matchHeader and falls back to details, the
+    (description, date, format) of the match in the main database, and to
+    the teams of the first innings.
+    """
+    header = data.get("matchHeader") or {}
+    description, match_date, match_format = details or (None, None, None)
+    if header.get("matchStartTimestamp"):
+        match_date = datetime.fromtimestamp(int(header["matchStartTimestamp"]) / 1000, timezone.utc).date()
+
+    teams = [header.get(k, {}).get("name") for k in ("team1", "team2")]
+    innings = (data.get("scoreCard") or [{}])[0]
+    if not all(teams):
+        teams = [innings.get("batTeamDetails", {}).get("batTeamName"),
+                 innings.get("bowlTeamDetails", {}).get("bowlTeamName")]
+
+    match_format = (header.get("matchFormat") or match_format or "").upper()
+    return {
+        "match_id": match_id,
+        "match_description": header.get("matchDescription") or description or f"Match {match_id}",
+        "team1": teams[0],
+        "team2": teams[1],
+        "match_date": match_date or date.today(),
+        "match_type": MATCH_TYPES.get(match_format, match_format.title() or "Unknown"),
+        "status": MATCH_STATUSES.get(header.get("state"), "Ongoing"),
+    }
+
+
+def _copy(cursor, table, columns, rows):
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def load_dimensions(conn, payloads, details=None):
+    """Insert the teams and players of a batch of scorecards that are not in the analytics DB yet.
+
+    Runs as its own transaction before the per-match loads, so the keys
+    the worker connections read from the shared caches are committed.
+    Players are keyed on their Cricbuzz id; country is left NULL because
+    a scorecard only names the team, which may be a franchise.
+    """
+    details = details or {}
+    teams, players = set(), {}
+    for match_id, data in payloads.items():
+        batting, bowling = parse_scorecard(data)
+        match = parse_match(data, match_id, details.get(match_id))
+        teams |= {t for t in [r["team"] for r in batting + bowling] + [match["team1"], match["team2"]] if t}
+        players.update((r["player_id"], r["player"]) for r in batting + bowling if r["player_id"] and r["player"])
+
+    team_cache.ensure(conn, sorted(teams))
+    player_cache.ensure(conn, sorted(players), {"player_name": players})
+
+
+def load_scorecard(conn, match_id, data, details=None):
+    """Replace one match's batting and bowling rows in a single transaction.
+
+    Writes the analytics database (tables.sql). The match's teams and
+    players must already be committed by load_dimensions(); the match row
+    is upserted first so the performance rows' foreign keys hold.
+    """
+    batting, bowling = parse_scorecard(data)
+    match = parse_match(data, match_id, details)
+    if not (match["team1"] and match["team2"]):
+        raise ValueError(f"scorecard of match {match_id} does not name both teams")
+
+    teams = {r["team"] for r in batting + bowling if r["team"]} | {match["team1"], match["team2"]}
+    players = {r["player_id"] for r in batting + bowling if r["player_id"]}
+    players |= {r["bowler_id"] for r in batting if r["bowler_id"]}
+    team_ids = team_cache.resolve(conn, sorted(teams))
+    player_ids = player_cache.resolve(conn, sorted(players))
+    if match["team1"] not in team_ids or match["team2"] not in team_ids:
+        raise ValueError(f"teams of match {match_id} are not loaded")
+
+    conn.execute(
+        text("""
+        INSERT INTO matches (match_id, match_description, team1_id, team2_id, match_date, match_type, status)
+        VALUES (:match_id, :descr, :team1, :team2, :match_date, :match_type, :status)
+        ON CONFLICT (match_id) DO UPDATE
+        SET match_description = EXCLUDED.match_description, team1_id = EXCLUDED.team1_id,
+            team2_id = EXCLUDED.team2_id, match_date = EXCLUDED.match_date,
+            match_type = EXCLUDED.match_type, status = EXCLUDED.status
+        """),
+        {"match_id": match_id, "descr": match["match_description"], "team1": team_ids[match["team1"]],
+         "team2": team_ids[match["team2"]], "match_date": match["match_date"],
+         "match_type": match["match_type"], "status": match["status"]},
+    )
+
+    bat_rows = [
+        [match_id, player_ids[r["player_id"]], team_ids[r["team"]]]
+        + [r[c] for c in BATTING_COLUMNS[3:-1]] + [player_ids.get(r["bowler_id"])]
+        for r in batting if r["player_id"] in player_ids and r["team"] in team_ids
+    ]
+    bowl_rows = [
+        [match_id, player_ids[r["player_id"]], team_ids[r["team"]]] + [r[c] for c in BOWLING_COLUMNS[3:]]
+        for r in bowling if r["player_id"] in player_ids and r["team"] in team_ids
+    ]
+
+    # Delete-then-COPY keeps re-runs idempotent without a natural unique key
+    conn.execute(text("DELETE FROM batting_performances WHERE match_id = :mid"), {"mid": match_id})
+    conn.execute(text("DELETE FROM bowling_performances WHERE match_id = :mid"), {"mid": match_id})
+    cursor = conn.connection.cursor()
+    try:
+        _copy(cursor, "batting_performances", BATTING_COLUMNS, bat_rows)
+        _copy(cursor, "bowling_performances", BOWLING_COLUMNS, bowl_rows)
+    finally:
+        cursor.close()
+    return len(bat_rows), len(bowl_rows)
+
+
+def load_scorecards(match_ids, workers=4):
+    """Fetch scorecards concurrently, then load them on a pool of worker connections."""
+    match_ids = list(match_ids)
+    if not match_ids:
+        return
+    start = time.perf_counter()
+    payloads = fetch_scorecards(match_ids)
+    details = match_details(match_ids)
+    for match_id, data in list(payloads.items()):
+        if isinstance(data, Exception):
+            log.error("❌ Scorecard fetch failed for match %s: %s", match_id, data)
+            del payloads[match_id]
+        else:
+            archive_payload(scorecard_path(match_id), data)
+    if not payloads:
+        return
+
+    conn = get_connection(role="etl", database="analytics")
+    if not conn:
+        log.error("❌ Analytics DB connection failed.")
+        return
+    try:
+        load_dimensions(conn, payloads, details)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        player_cache.invalidate()
+        team_cache.invalidate()
+        log.error("❌ Error loading scorecard teams and players: %s", e)
+        return
+    finally:
+        conn.close()
+
+    local = threading.local()
+    opened = []
+    lock = threading.Lock()
+
+    def worker(match_id, data):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = get_connection(role="etl", database="analytics")
+            if not conn:
+                raise RuntimeError("analytics DB connection failed")
+            with lock:
+                opened.append(conn)
+        try:
+            counts = load_scorecard(conn, match_id, data, details.get(match_id))
+            conn.commit()
+            return counts
+        except Exception:
+            conn.rollback()
+            raise
+
+    loaded = batting = bowling = 0
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scorecard") as pool:
+            futures = {}
+            for match_id, data in payloads.items():
+                futures[pool.submit(worker, match_id, data)] = match_id
+
+            for future in as_completed(futures):
+                try:
+                    bat, bowl = future.result()
+                    loaded += 1
+                    batting += bat
+                    bowling += bowl
+                except Exception as e:
+                    log.error("❌ Error loading scorecard for match %s: %s", futures[future], e)
+    finally:
+        for conn in opened:
+            conn.close()
+
+    elapsed = time.perf_counter() - start
+    log.info("🏏 Loaded %d/%d scorecards (%d batting, %d bowling rows) in %.2fs",
+             loaded, len(match_ids), batting, bowling, elapsed)
+
+
+def match_details(match_ids):
+    """{match_id: (description, date, format)} of the matches the ETL loaded into the main database."""
+    conn = get_connection(role="etl")
+    if not conn:
+        return {}
+    try:
+        rows = conn.execute(
+            text("SELECT match_id, match_description, match_date, victory_type FROM matches "
+                 "WHERE match_id = ANY(:ids)"),
+            {"ids": list(match_ids)},
+        ).fetchall()
+        return {mid: (descr, match_date, fmt) for mid, descr, match_date, fmt in rows}
+    finally:
+        conn.close()
+
+
+def recent_match_ids(days):
+    conn = get_connection(role="etl")
+    if not conn:
+        log.error("❌ DB connection failed.")
+        return []
+    try:
+        rows = conn.execute(
+            text("SELECT match_id FROM matches WHERE match_date >= CURRENT_DATE - :days"),
+            {"days": days},
+        ).fetchall()
+        return [r[0] for r in rows]
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load Cricbuzz scorecards into batting/bowling_performances")
+    parser.add_argument("match_ids", nargs="*", type=int, help="matches to load (default: recent matches)")
+    parser.add_argument("--since-days", type=int, default=2, help="load matches dated within this many days")
+    parser.add_argument("--workers", type=int, default=4, help="parallel loader connections")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    load_scorecards(args.match_ids or recent_match_ids(args.since_days), workers=args.workers)
+    refresh_views()
@@ -0,0 +1,252 @@
+"""Push service for live score changes.
+
+Holds one LISTEN connection to Postgres. When the ETL commits new scores
+it reads the changed match_summary rows once and fans them out to every
+subscriber, so viewers cost no database work:
+
+    python live_feed.py --port 8766
+    LIVE_FEED_URL=http://127.0.0.1:8766 streamlit run app.py
+
+Endpoints:
+    GET /events             Server-Sent Events; resumes from Last-Event-ID
+    GET /changes?since=SEQ  JSON rows changed after SEQ (for pollers)
+    GET /snapshot           JSON of every match currently held
+"""
+import json
+import asyncio
+import logging
+import argparse
+from datetime import date
+from collections import deque
+from dotenv import load_dotenv
+from aiohttp import web
+from sqlalchemy import text
+from utils.db_connection import get_connection
+from utils.change_events import listen_connection
+
+load_dotenv()
+
+log = logging.getLogger("live_feed")
+
+SUMMARY_COLUMNS = """
+    match_id, match_description, match_date, venue_name, city,
+    team1_name, team1_runs, team1_wickets, team1_overs,
+    team2_name, team2_runs, team2_wickets, team2_overs,
+    teams_with_scores, change_seq, updated_at
+"""
+
+
+def _json(payload):
+    return json.dumps(payload, separators=(",", ":"), default=str)
+
+
+class LiveFeed:
+    """In-memory view of match_summary kept current from NOTIFY, plus subscriber fan-out."""
+
+    def __init__(self, limit, history, poll_interval):
+        self.limit = limit
+        self.poll_interval = poll_interval
+        self.matches = {}
+        self.history = deque(maxlen=history)
+        self.seq = 0
+        # Every change after base_seq is still in history
+        self.base_seq = 0
+        self.subscribers = set()
+        self._wake = asyncio.Event()
+        self._raw = None
+
+    # ---------------- Database side ----------------
+    def _query(self, sql, params=None):
+        conn = get_connection()
+        if not conn:
+            raise RuntimeError("DB connection failed")
+        try:
+            return [dict(r) for r in conn.execute(text(sql), params or {}).mappings().fetchall()]
+        finally:
+            conn.close()
+
+    async def load_snapshot(self):
+        # Read the position first: rows changed in between are simply delivered again
+        latest = await asyncio.to_thread(self._query, "SELECT COALESCE(max(change_seq), 0) AS seq FROM match_summary")
+        rows = await asyncio.to_thread(self._query, f"""
+            SELECT {SUMMARY_COLUMNS} FROM match_summary
+            WHERE teams_with_scores > 0
+            ORDER BY match_date DESC, match_id DESC
+            LIMIT :n
+        """, {"n": self.limit})
+        self.matches = {r["match_id"]: r for r in rows}
+        self.seq = self.base_seq = latest[0]["seq"]
+        self.history.clear()
+        log.info("📸 Snapshot of %d matches at change_seq %d", len(self.matches), self.seq)
+
+    async def poll_changes(self):
+        rows = await asyncio.to_thread(self._query, f"""
+            SELECT {SUMMARY_COLUMNS} FROM match_summary
+            WHERE change_seq > :since
+            ORDER BY change_seq
+        """, {"since": self.seq})
+        for row in rows:
+            self.seq = max(self.seq, row["change_seq"])
+            if row["teams_with_scores"] > 0:
+                self.matches[row["match_id"]] = row
+            else:
+                self.matches.pop(row["match_id"], None)
+            if len(self.history) == self.history.maxlen:
+                self.base_seq = self.history[0]["change_seq"]
+            self.history.append(row)
+        if rows:
+            self._trim()
+            message = f"id: {self.seq}\nevent: changes\ndata: {_json(rows)}\n\n".encode()
+            for queue in list(self.subscribers):
+                try:
+                    queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    # A subscriber that cannot keep up is dropped; it resumes via Last-Event-ID
+                    self.subscribers.discard(queue)
+            log.info("📣 %d changed matches pushed to %d subscribers", len(rows), len(self.subscribers))
+
+    def _trim(self):
+        if len(self.matches) <= self.limit:
+            return
+        keep = sorted(self.matches.values(), key=lambda r: (r["match_date"] or date.min, r["match_id"]), reverse=True)
+        self.matches = {r["match_id"]: r for r in keep[:self.limit]}
+
+    def _on_notify(self):
+        self._raw.poll()
+        relevant = False
+        while self._raw.notifies:
+            notify = self._raw.notifies.pop(0)
+            try:
+                relevant |= "match_summary" in json.loads(notify.payload).get("tables", [])
+            except ValueError:
+                relevant = True
+        if relevant:
+            self._wake.set()
+
+    async def run(self):
+        """The single database reader: LISTEN plus a fallback poll for missed notifications."""
+        loop = asyncio.get_running_loop()
+        while True:
+            conn = None
+            try:
+                conn = await asyncio.to_thread(get_connection)
+                if not conn:
+                    raise RuntimeError("DB connection failed")
+                self._raw = listen_connection(conn)
+                loop.add_reader(self._raw.fileno(), self._on_notify)
+                await self.poll_changes()
+                while True:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wake.clear()
+                    await self.poll_changes()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("Feed reader disconnected: %s", e)
+                await asyncio.sleep(5)
+            finally:
+                if self._raw is not None:
+                    loop.remove_reader(self._raw.fileno())
+                    self._raw = None
+                if conn is not None:
+                    conn.close()
+
+    # ---------------- HTTP side ----------------
+    def changes_since(self, since):
+        """Rows changed after `since`, or None when that is older than the history kept."""
+        if since < self.base_seq:
+            return None
+        return [r for r in self.history if r["change_seq"] > since]
+
+    def snapshot(self):
+        return {"seq": self.seq, "matches": list(self.matches.values())}
+
+    async def handle_snapshot(self, request):
+        return web.Response(text=_json(self.snapshot()), content_type="application/json")
+
+    async def handle_changes(self, request):
+        try:
+            since = int(request.query.get("since", 0))
+        except ValueError:
+            raise web.HTTPBadRequest(text="since must be an integer")
+        changes = self.changes_since(since)
+        if changes is None:
+            body = {"reset": True, **self.snapshot()}
+        else:
+            body = {"reset": False, "seq": self.seq, "matches": changes}
+        return web.Response(text=_json(body), content_type="application/json")
+
+    async def handle_events(self, request):
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        })
+        await response.prepare(request)
+
+        queue = asyncio.Queue(maxsize=256)
+        self.subscribers.add(queue)
+        try:
+            last_id = request.headers.get("Last-Event-ID") or request.query.get("since")
+            changes = self.changes_since(int(last_id)) if last_id and last_id.isdigit() else None
+            if changes is None:
+                await response.write(f"id: {self.seq}\nevent: snapshot\ndata: {_json(self.snapshot()['matches'])}\n\n".encode())
+            elif changes:
+                await response.write(f"id: {self.seq}\nevent: changes\ndata: {_json(changes)}\n\n".encode())
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    if queue not in self.subscribers:
+                        break
+                    message = b": keep-alive\n\n"
+                await response.write(message)
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self.subscribers.discard(queue)
+        return response
+
+
+async def start_reader(app):
+    feed = app["feed"]
+    await feed.load_snapshot()
+    app["reader"] = asyncio.create_task(feed.run())
+
+
+async def stop_reader(app):
+    app["reader"].cancel()
+    try:
+        await app["reader"]
+    except asyncio.CancelledError:
+        pass
+
+
+def create_app(limit=200, history=5000, poll_interval=30.0):
+    app = web.Application()
+    feed = LiveFeed(limit, history, poll_interval)
+    app["feed"] = feed
+    app.router.add_get("/events", feed.handle_events)
+    app.router.add_get("/changes", feed.handle_changes)
+    app.router.add_get("/snapshot", feed.handle_snapshot)
+    app.on_startup.append(start_reader)
+    app.on_cleanup.append(stop_reader)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve live score changes over Server-Sent Events")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--limit", type=int, default=200, help="most recent scored matches held in memory")
+    parser.add_argument("--history", type=int, default=5000, help="changes kept for resuming subscribers")
+    parser.add_argument("--poll-interval", type=float, default=30.0,
+                        help="fallback poll in seconds in case a notification is missed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    web.run_app(create_app(args.limit, args.history, args.poll_interval), host=args.host, port=args.port)
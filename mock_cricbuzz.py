@@ -0,0 +1,267 @@
+"""Local stand-in for the Cricbuzz RapidAPI endpoints used by the ETL and the pages.
+
+Run it and point the loader or Streamlit at it:
+
+    python mock_cricbuzz.py --matches 10000 --players 2000 --churn 0.1
+    CRICBUZZ_BASE_URL=http://127.0.0.1:8765 python etl_load.py
+"""
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COUNTRIES = [
+    "India", "Australia", "England", "Pakistan", "South Africa", "New Zealand",
+    "Sri Lanka", "Bangladesh", "West Indies", "Afghanistan", "Ireland", "Zimbabwe",
+]
+FORMATS = ["TEST", "ODI", "T20"]
+STATES = ["In Progress", "In Progress", "Innings Break", "Stumps", "Complete", "Preview"]
+STAT_TYPES = {
+    "Batting": [("mostRuns", "Most Runs"), ("highestScore", "Highest Scores"),
+                ("highestAvg", "Best Batting Average"), ("mostHundreds", "Most Hundreds"),
+                ("mostSixes", "Most Sixes")],
+    "Bowling": [("mostWickets", "Most Wickets"), ("lowestAvg", "Best Bowling Average"),
+                ("bestBowlingInnings", "Best Bowling"), ("mostFiveWickets", "Most 5 Wicket Hauls"),
+                ("lowestEcon", "Best Economy")],
+}
+
+
+def _overs(balls):
+    return float(f"{balls // 6}.{balls % 6}")
+
+
+def build_world(series=10, matches=100, players=500, seed=0):
+    """Generate a deterministic set of series, matches, teams, venues and players."""
+    rng = random.Random(seed)
+    teams = COUNTRIES + [f"XI {i}" for i in range(max(0, series * 2 - len(COUNTRIES)))]
+    venues = [(f"Ground {i}", f"City {i % 97}") for i in range(max(10, matches // 20))]
+    names = [f"Player {i:05d}" for i in range(players)]
+    start = datetime(2024, 1, 1)
+
+    world = {"series": [], "matches": {}, "players": names, "seed": seed}
+    for s in range(series):
+        world["series"].append({"seriesId": 1000 + s, "seriesName": f"Synthetic Series {s + 1}", "matchIds": []})
+
+    for m in range(matches):
+        s = world["series"][m % series]
+        team1, team2 = rng.sample(teams, 2)
+        ground, city = rng.choice(venues)
+        match_id = 100000 + m
+        balls1, balls2 = rng.randint(0, 300), rng.randint(0, 120)
+        world["matches"][match_id] = {
+            "matchInfo": {
+                "matchId": match_id,
+                "seriesId": s["seriesId"],
+                "seriesName": s["seriesName"],
+                "matchDesc": f"Match {len(s['matchIds']) + 1}",
+                "matchFormat": rng.choice(FORMATS),
+                "startDate": str(int((start + timedelta(days=m % 365)).timestamp() * 1000)),
+                "state": rng.choice(STATES),
+                "team1": {"teamId": teams.index(team1) + 1, "teamName": team1},
+                "team2": {"teamId": teams.index(team2) + 1, "teamName": team2},
+                "venueInfo": {"ground": ground, "city": city},
+            },
+            "matchScore": {
+                "team1Score": {"inngs1": {"inningsId": 1, "runs": balls1 * rng.randint(4, 8) // 6,
+                                          "wickets": min(10, balls1 // 30), "overs": _overs(balls1)}},
+                "team2Score": {"inngs1": {"inningsId": 2, "runs": balls2 * rng.randint(4, 8) // 6,
+                                          "wickets": min(10, balls2 // 30), "overs": _overs(balls2)}},
+            },
+        }
+        s["matchIds"].append(match_id)
+    return world
+
+
+def advance(world, fraction, rng):
+    """Move a fraction of the in-progress matches on by one ball."""
+    live = [m for m in world["matches"].values() if m["matchInfo"]["state"] == "In Progress"]
+    for match in rng.sample(live, int(len(live) * fraction)):
+        innings = match["matchScore"]["team2Score"]["inngs1"]
+        overs, _, ball = str(innings["overs"]).partition(".")
+        balls = int(overs) * 6 + int(ball or 0) + 1
+        innings["overs"] = _overs(balls)
+        innings["runs"] += rng.choice([0, 0, 1, 1, 2, 4, 6])
+        if rng.random() < 0.04 and innings["wickets"] < 10:
+            innings["wickets"] += 1
+
+
+def live_payload(world):
+    series_matches = [
+        {"seriesAdWrapper": {
+            "seriesId": s["seriesId"],
+            "seriesName": s["seriesName"],
+            "matches": [world["matches"][mid] for mid in s["matchIds"]],
+        }}
+        for s in world["series"]
+    ]
+    return {"typeMatches": [{"matchType": "International", "seriesMatches": series_matches}]}
+
+
+def scorecard_payload(world, match_id):
+    match = world["matches"].get(match_id)
+    if match is None:
+        return None
+    rng = random.Random(match_id ^ world["seed"])
+    info = match["matchInfo"]
+    scorecard = []
+    for innings_id, (bat, bowl) in enumerate([(info["team1"], info["team2"]), (info["team2"], info["team1"])], start=1):
+        # Player ids are positions in world["players"] + 1, stable across matches like Cricbuzz's
+        squad = rng.sample(range(1, len(world["players"]) + 1), min(16, len(world["players"])))
+        batters, bowlers = squad[:11], squad[11:]
+        bowlers_data = {
+            f"bowl_{i}": {"bowlerId": pid, "bowlName": world["players"][pid - 1], "overs": rng.randint(1, 10),
+                          "maidens": rng.randint(0, 2), "runs": rng.randint(10, 70), "wickets": rng.randint(0, 4),
+                          "economy": round(rng.uniform(3, 10), 2)}
+            for i, pid in enumerate(bowlers, start=1)
+        }
+        batsmen_data = {}
+        for i, pid in enumerate(batters, start=1):
+            balls = rng.randint(0, 120)
+            runs = balls * rng.randint(50, 150) // 100
+            out = rng.random() < 0.8
+            batsmen_data[f"bat_{i}"] = {
+                "batId": pid, "batName": world["players"][pid - 1], "runs": runs, "balls": balls,
+                "fours": runs // 12, "sixes": runs // 30,
+                "strikeRate": round(runs * 100 / balls, 2) if balls else 0,
+                "outDesc": "c sub b bowler" if out and balls else "",
+                "wicketCode": "CAUGHT" if out and balls else "",
+                "bowlerId": rng.choice(bowlers) if out and balls else 0,
+            }
+        scorecard.append({
+            "matchId": match_id,
+            "inningsId": innings_id,
+            "batTeamDetails": {"batTeamId": bat["teamId"], "batTeamName": bat["teamName"], "batsmenData": batsmen_data},
+            "bowlTeamDetails": {"bowlTeamId": bowl["teamId"], "bowlTeamName": bowl["teamName"], "bowlersData": bowlers_data},
+        })
+    header = {
+        "matchId": match_id,
+        "matchDescription": info["matchDesc"],
+        "matchFormat": info["matchFormat"],
+        "matchStartTimestamp": int(info["startDate"]),
+        "state": info["state"],
+        "team1": {"id": info["team1"]["teamId"], "name": info["team1"]["teamName"]},
+        "team2": {"id": info["team2"]["teamId"], "name": info["team2"]["teamName"]},
+    }
+    return {"scoreCard": scorecard, "matchHeader": header}
+
+
+def stat_types_payload():
+    return {"statsTypesList": [
+        {"category": category, "types": [{"value": v, "header": h, "category": category} for v, h in types]}
+        for category, types in STAT_TYPES.items()
+    ]}
+
+
+def leaderboard_payload(world, stats_type, format_type):
+    header = next((h for types in STAT_TYPES.values() for v, h in types if v == stats_type), None)
+    if header is None:
+        return None
+    rng = random.Random(f"{stats_type}/{format_type}/{world['seed']}")
+    names = rng.sample(world["players"], min(100, len(world["players"])))
+    values = sorted(((n, rng.randint(1, 12000)) for n in names), key=lambda x: -x[1])
+    return {
+        "filter": {"selectedMatchType": format_type},
+        "headers": ["Player", header.split()[-1], "Matches", "Inns", "Avg"],
+        "values": [{"values": [n, f"{v:,}", str(rng.randint(5, 200)), str(rng.randint(5, 300)),
+                               f"{rng.uniform(10, 60):.2f}"]} for n, v in values],
+    }
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server_version = "MockCricbuzz/1.0"
+
+    def do_GET(self):
+        opts = self.server.opts
+        if opts.latency_ms:
+            time.sleep(max(0.0, random.gauss(opts.latency_ms, opts.latency_ms / 4)) / 1000)
+        roll = random.random()
+        if roll < opts.error_rate / 2:
+            return self._send(429, {"message": "Too many requests"}, {"Retry-After": "1"})
+        if roll < opts.error_rate:
+            return self._send(500, {"message": "Injected upstream error"})
+
+        parsed = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        path = parsed.path.rstrip("/")
+
+        if path in ("/matches/v1/live", "/matches/v1/recent", "/matches/v1/upcoming"):
+            return self._send_live()
+        if m := re.fullmatch(r"/mcenter/v1/(\d+)/(?:h?scard)", path):
+            with self.server.lock:
+                body = scorecard_payload(self.server.world, int(m.group(1)))
+            return self._send(200 if body else 404, body or {"message": "Match not found"})
+        if path == "/stats/v1/topstats":
+            return self._send(200, stat_types_payload())
+        if path == "/stats/v1/topstats/0":
+            body = leaderboard_payload(self.server.world, query.get("statsType"), query.get("formatType", "test"))
+            return self._send(200 if body else 404, body or {"message": "Unknown statsType"})
+        self._send(404, {"message": f"No mock for {path}"})
+
+    def _send_live(self):
+        with self.server.lock:
+            if self.server.opts.churn:
+                advance(self.server.world, self.server.opts.churn, self.server.rng)
+                self.server.live_cache = None
+            if self.server.live_cache is None:
+                body = json.dumps(live_payload(self.server.world), separators=(",", ":")).encode()
+                self.server.live_cache = (body, f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"')
+            body, etag = self.server.live_cache
+        if self.headers.get("If-None-Match") == etag:
+            return self._send_raw(304, b"", {"ETag": etag})
+        self._send_raw(200, body, {"ETag": etag})
+
+    def _send(self, status, payload, extra=None):
+        self._send_raw(status, json.dumps(payload, separators=(",", ":")).encode(), extra)
+
+    def _send_raw(self, status, body, extra=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        if not self.server.opts.quiet:
+            super().log_message(fmt, *args)
+
+
+def serve(opts):
+    server = ThreadingHTTPServer((opts.host, opts.port), MockHandler)
+    server.opts = opts
+    server.lock = threading.Lock()
+    server.rng = random.Random(opts.seed)
+    server.world = build_world(opts.series, opts.matches, opts.players, opts.seed)
+    server.live_cache = None
+    print(f"🏏 Mock Cricbuzz API with {opts.matches} matches, {opts.players} players "
+          f"on http://{opts.host}:{opts.port}")
+    print(f"   export CRICBUZZ_BASE_URL=http://{opts.host}:{opts.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic Cricbuzz API responses locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--series", type=int, default=10)
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--churn", type=float, default=0.0,
+                        help="fraction of in-progress matches advanced on every live-feed request")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mean injected response latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 429/500")
+    parser.add_argument("--quiet", action="store_true", help="do not log every request")
+    serve(parser.parse_args())
@@ -2,7 +2,9 @@ import streamlit as st
 import pandas as pd
 from utils.db_connection import get_connection
 from sqlalchemy import text
-from datetime import datetime
+import os
+import requests
+from datetime import date, datetime
 
 # Page Config
 st.set_page_config(page_title="Live Matches | Cricbuzz LiveStats", layout="wide", page_icon="⚡")
@@ -52,73 +54,138 @@ with col1:
 with col2:
     st.markdown("<div class='live-indicator'>🔴 LIVE</div>", unsafe_allow_html=True)
 
-# Function to fetch live matches
-def fetch_live_matches():
-    query = """
-        SELECT
-            m.match_id,
-            m.match_description,
-            v.venue_name,
-            v.city,
-            STRING_AGG(
-                t.team_name || ': ' ||
-                COALESCE(s.runs::text, '0') || '/' ||
-                COALESCE(s.wickets::text, '0') || ' (' ||
-                COALESCE(s.overs::text, '0') || ' ov)', ' | '
-                ORDER BY s.team_id
-            ) AS scores,
-            COUNT(s.match_id) as teams_batting
-        FROM matches m
-        LEFT JOIN match_scores s ON m.match_id = s.match_id
-        LEFT JOIN teams t ON s.team_id = t.team_id
-        LEFT JOIN venues v ON m.venue_id = v.venue_id
-        GROUP BY m.match_id, m.match_description, v.venue_name, v.city
-        HAVING COUNT(s.match_id) > 0  -- only show matches with scores
-        ORDER BY m.match_date DESC
-        LIMIT 20;
+LIVE_LIMIT = 20
+DEFAULT_REFRESH_SECONDS = int(os.getenv("LIVE_REFRESH_SECONDS", "10"))
+# When set, changes come from the live_feed.py push service instead of Postgres
+LIVE_FEED_URL = os.getenv("LIVE_FEED_URL", "").rstrip("/")
+
+SUMMARY_COLUMNS = """
+    match_id, match_description, match_date, venue_name, city,
+    team1_name, team1_runs, team1_wickets, team1_overs,
+    team2_name, team2_runs, team2_wickets, team2_overs,
+    teams_with_scores, change_seq, updated_at
+"""
+
+def format_score(team, runs, wickets, overs):
+    return f"{team}: {runs if runs is not None else 0}/{wickets if wickets is not None else 0} ({overs if overs is not None else 0} ov)"
+
+def build_card(row):
+    """Cached per match and rebuilt only when the match's change_seq moves."""
+    scores = " | ".join(
+        format_score(row[f"{slot}_name"], row[f"{slot}_runs"], row[f"{slot}_wickets"], row[f"{slot}_overs"])
+        for slot in ("team1", "team2") if row[f"{slot}_name"]
+    )
+    card = dict(row, scores=scores)
+    card["html"] = f"""
+        <div class="match-card">
+            <h4>{row['match_description']}</h4>
+            <p><strong>📍 Venue:</strong> {row['venue_name'] or 'TBD'}, {row['city'] or ''}</p>
+            <p><strong>🏏 Scores:</strong> {scores}</p>
+        </div>
+    """
+    return card
+
+def sync_live_matches(state):
+    """Bring the session's cards up to date with match_summary.
+
+    One small query for the current top-N (match_id, change_seq) pairs, plus
+    one fetch of the rows whose change_seq differs from the cached card.
     """
     conn = get_connection()
     if not conn:
-        st.error("❌ Database connection failed.")
-        return pd.DataFrame()
+        raise RuntimeError("Database connection failed.")
 
     try:
-        result = conn.execute(text(query))
-        rows = result.fetchall()
-        colnames = result.keys()
-        return pd.DataFrame(rows, columns=colnames) if rows else pd.DataFrame()
-    except Exception as e:
-        st.error(f"❌ Query failed: {e}")
-        return pd.DataFrame()
+        top = conn.execute(text("""
+            SELECT match_id, change_seq
+            FROM match_summary
+            WHERE teams_with_scores > 0  -- only show matches with scores
+            ORDER BY match_date DESC, match_id DESC
+            LIMIT :n
+        """), {"n": LIVE_LIMIT}).fetchall()
+
+        cards = state["cards"]
+        stale = [mid for mid, seq in top if mid not in cards or cards[mid]["change_seq"] != seq]
+        rows = []
+        if stale:
+            rows = conn.execute(
+                text(f"SELECT {SUMMARY_COLUMNS} FROM match_summary WHERE match_id = ANY(:ids)"),
+                {"ids": stale},
+            ).mappings().fetchall()
     finally:
         conn.close()
 
-# Fetch and display matches
-with st.spinner("🔄 Fetching live scores..."):
-    df = fetch_live_matches()
+    order = [mid for mid, _ in top]
+    kept = {mid: cards[mid] for mid in order if mid in cards and mid not in stale}
+    kept.update((row["match_id"], build_card(row)) for row in rows)
+    state["cards"] = kept
+    state["order"] = [mid for mid in order if mid in kept]
+    return len(rows)
+
+def sync_from_feed(state):
+    """Apply the rows the feed service saw change since this session's last tick."""
+    response = requests.get(f"{LIVE_FEED_URL}/changes", params={"since": state.get("seq", 0)}, timeout=5)
+    response.raise_for_status()
+    body = response.json()
+
+    cards = {} if body["reset"] else dict(state["cards"])
+    changed = 0
+    for row in body["matches"]:
+        row["match_date"] = date.fromisoformat(row["match_date"]) if row["match_date"] else None
+        row["updated_at"] = datetime.fromisoformat(row["updated_at"])
+        if row["teams_with_scores"] > 0:
+            cards[row["match_id"]] = build_card(row)
+            changed += 1
+        else:
+            cards.pop(row["match_id"], None)
+
+    top = sorted(cards.values(), key=lambda c: (c["match_date"] or date.min, c["match_id"]), reverse=True)[:LIVE_LIMIT]
+    state["cards"] = {c["match_id"]: c for c in top}
+    state["order"] = [c["match_id"] for c in top]
+    state["seq"] = body["seq"]
+    return changed
+
+# Auto-refresh controls
+auto_refresh = st.sidebar.toggle("🔁 Auto-refresh", value=True)
+refresh_seconds = st.sidebar.slider(
+    "Refresh every (seconds)", min_value=5, max_value=120,
+    value=DEFAULT_REFRESH_SECONDS, disabled=not auto_refresh,
+)
+
+# Only this fragment reruns on each tick; unchanged cards reuse their cached HTML
+@st.fragment(run_every=refresh_seconds if auto_refresh else None)
+def live_matches_panel():
+    state = st.session_state.setdefault("live_matches", {"cards": {}, "order": []})
+    try:
+        if LIVE_FEED_URL:
+            sync_from_feed(state)
+        else:
+            sync_live_matches(state)
+    except Exception as e:
+        st.error(f"❌ Query failed: {e}")
+
+    cards = [state["cards"][mid] for mid in state["order"]]
+    if not cards:
+        st.warning("📭 No live matches currently.")
+        st.info("💡 Tip: Run `python etl_load.py` to fetch the latest match data.")
+        return
 
-if df.empty:
-    st.warning("📭 No live matches currently.")
-    st.info("💡 Tip: Run `python etl_load.py` to fetch the latest match data.")
-else:
     # Display line by line as cards
-    st.subheader(f"📊 {len(df)} Live Matches Found")
-    for idx, row in df.iterrows():
-        st.markdown(f"""
-        <div class="match-card">
-            <h4>{row['match_description']}</h4>
-            <p><strong>📍 Venue:</strong> {row['venue_name'] or 'TBD'}, {row['city'] or ''}</p>
-            <p><strong>🏏 Scores:</strong> {row['scores']}</p>
-        </div>
-        """, unsafe_allow_html=True)
+    st.subheader(f"📊 {len(cards)} Live Matches Found")
+    st.markdown("".join(card["html"] for card in cards), unsafe_allow_html=True)
 
     # Optional toggle: Show as table
     if st.checkbox("📋 View as Table"):
-        display_df = df[['match_description', 'venue_name', 'city', 'scores']].copy()
+        display_df = pd.DataFrame(cards)[['match_description', 'venue_name', 'city', 'scores']]
         display_df.columns = ['Match', 'Venue', 'City', 'Scores']
         st.dataframe(display_df, use_container_width=True)
 
+    # Time the shown data was last written by the ETL, not the render time
+    data_time = max(card["updated_at"] for card in cards)
+    st.markdown(f"*Last refreshed: {data_time.strftime('%Y-%m-%d %H:%M:%S')}*")
+
+live_matches_panel()
+
 # Footer
 st.markdown("---")
-st.markdown(f"*Last refreshed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
 st.markdown("*Data fetched from Cricbuzz API*")
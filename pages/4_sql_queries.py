@@ -1,8 +1,15 @@
 import streamlit as st
 import pandas as pd
-from utils.db_connection_2 import get_connection
+from utils.db_connection import get_connection, POOL_SIZE
+from utils.query_cache import result_cache, source_tables
+from utils.analytics_views import view_refreshes
+from utils.query_profiler import explain_analyze, plan_nodes, hot_nodes, plan_history
 from sqlalchemy import text
+import os
 import time
+import threading
+import altair as alt
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Page Config
@@ -72,26 +79,95 @@ difficulty_filter = st.sidebar.selectbox(
     ["All Queries", "Beginner (1-8)", "Intermediate (9-16)"]
 )
 
+use_result_cache = st.sidebar.checkbox(
+    "⚡ Reuse cached results", value=True,
+    help="Serve a query from the shared result cache until one of its source tables changes"
+)
+
+profiling_mode = st.sidebar.checkbox(
+    "🔬 Profiling mode (EXPLAIN ANALYZE)", value=False,
+    help="Also run each query under EXPLAIN (ANALYZE, BUFFERS) and compare its plan with earlier runs"
+)
+
+# Queries run at once by "Run all"; each holds one pooled connection, so no more than the pool keeps
+BATCH_WORKERS = min(int(os.getenv("ANALYTICS_BATCH_WORKERS", "8")), POOL_SIZE)
+
+@st.cache_resource
+def batch_slots():
+    """Connections all sessions' batches may hold at once; concurrent "Run all" clicks queue here
+    instead of timing out waiting for the pool"""
+    return threading.BoundedSemaphore(BATCH_WORKERS)
+
+def run_query(conn, query, timings=None):
+    """Run a query into a DataFrame, recording execute/fetch/build seconds into timings"""
+    t0 = time.perf_counter()
+    result = conn.execute(text(query))
+    t1 = time.perf_counter()
+    rows = result.fetchall()
+    t2 = time.perf_counter()
+    df = pd.DataFrame(rows, columns=list(result.keys()))
+    if timings is not None:
+        timings.update(execute=t1 - t0, fetch=t2 - t1, build=time.perf_counter() - t2)
+    return df
+
+def render_profile(query_id, plan, shape, flags):
+    """Plan tree with the most expensive nodes highlighted, regression flags and run history"""
+    st.markdown(f"**🔬 Query plan** `{shape}` · planning {plan.get('Planning Time', 0):.2f}ms · "
+                f"execution {plan.get('Execution Time', 0):.2f}ms")
+    for flag in flags:
+        st.warning(f"📉 Regressed compared with earlier runs: {flag}")
+    
+    rows = plan_nodes(plan)
+    hot = hot_nodes(rows)
+    st.dataframe(
+        pd.DataFrame(rows).style
+            .apply(lambda row: ["background-color: #f8d7da" if row.name in hot else ""] * len(row), axis=1)
+            .format({"Share": "{:.0%}"}),
+        use_container_width=True,
+        hide_index=True
+    )
+    with st.expander(f"🕘 Plan history - Query {query_id}"):
+        history = pd.DataFrame(plan_history().runs(query_id))
+        if not history.empty:
+            history["run_at"] = pd.to_datetime(history["run_at"], unit="s")
+        st.dataframe(history, use_container_width=True, hide_index=True)
+
 # Database connection function
-def execute_analytics_query(query, query_name):
+def execute_analytics_query(query, query_name, query_id=None):
     """Execute SQL query and return results with error handling"""
-    conn = get_connection()
+    conn = get_connection(role="analytics", database="analytics")
     if not conn:
         st.error("❌ Database connection failed")
-        return None
+        return None, 0
     
     try:
-        start_time = time.time()
-        result = conn.execute(text(query))
-        execution_time = round((time.time() - start_time) * 1000, 2)
+        plan = explain_analyze(conn, query) if profiling_mode else None
         
-        # Get column names and data
-        columns = list(result.keys())
-        rows = result.fetchall()
+        # Timed from execute through fetch and DataFrame construction
+        timings = {}
+        start_time = time.perf_counter()
+        if use_result_cache and query_id is not None and not profiling_mode:
+            df, cached = result_cache().get_or_run(conn, query_id, query, lambda c: run_query(c, query, timings))
+        else:
+            df, cached = run_query(conn, query, timings), False
+        execution_time = round((time.perf_counter() - start_time) * 1000, 2)
+        
+        if plan is not None:
+            # The rows come from a second run that finds the cache warm; report the profiled one
+            fetch_time = execution_time
+            execution_time = round(plan.get("Planning Time", 0.0) + plan.get("Execution Time", 0.0), 2)
+            shape, flags = plan_history().record(query_id or query_name, plan, execution_time)
+            render_profile(query_id or query_name, plan, shape, flags)
         
-        if rows:
-            df = pd.DataFrame(rows, columns=columns)
-            st.success(f"✅ Query executed successfully in {execution_time}ms")
+        if not df.empty:
+            if plan is not None:
+                st.success(f"🔬 Profiled run took {execution_time}ms under EXPLAIN ANALYZE; "
+                           f"the results shown come from a second run ({fetch_time}ms, warm cache)")
+            elif cached:
+                st.success(f"⚡ Served from cache in {execution_time}ms (source tables unchanged)")
+            else:
+                phases = " · ".join(f"{k} {v * 1000:.2f}ms" for k, v in timings.items())
+                st.success(f"✅ Query executed successfully in {execution_time}ms ({phases})")
             return df, execution_time
         else:
             st.warning("📭 No data returned by query")
@@ -103,6 +179,19 @@ def execute_analytics_query(query, query_name):
     finally:
         conn.close()
 
+@st.cache_data(ttl=60, show_spinner=False)
+def load_view_refreshes():
+    """{view: refreshed_at} of the materialized views; empty when unavailable"""
+    conn = get_connection(role="analytics", database="analytics")
+    if not conn:
+        return {}
+    try:
+        return view_refreshes(conn)
+    except Exception:
+        return {}
+    finally:
+        conn.close()
+
 # Main header
 st.markdown("""
 <div class="analytics-header">
@@ -330,6 +419,16 @@ ANALYTICS_QUERIES = {
         GROUP BY p.player_id, p.player_name
         ORDER BY ROUND(AVG(bp.runs_scored), 2) DESC;
         """,
+        "view_sql": """
+        SELECT 
+            player_name AS "Player Name",
+            test_runs AS "Test Runs",
+            odi_runs AS "ODI Runs",
+            t20i_runs AS "T20I Runs",
+            overall_average AS "Overall Average"
+        FROM mv_multi_format_players
+        ORDER BY overall_average DESC;
+        """,
         "expected_columns": ["Player Name", "Test Runs", "ODI Runs", "T20I Runs", "Overall Average"]
     },
 
@@ -380,6 +479,16 @@ ANALYTICS_QUERIES = {
         ORDER BY (SUM(CASE WHEN location = 'Home' AND team_id = winning_team_id THEN 1 ELSE 0 END) + 
                   SUM(CASE WHEN location = 'Away' AND team_id = winning_team_id THEN 1 ELSE 0 END)) DESC;
         """,
+        "view_sql": """
+        SELECT 
+            team_name AS "Team Name",
+            home_wins AS "Home Wins",
+            away_wins AS "Away Wins",
+            home_matches AS "Home Matches",
+            away_matches AS "Away Matches"
+        FROM mv_home_away_records
+        ORDER BY home_wins + away_wins DESC;
+        """,
         "expected_columns": ["Team Name", "Home Wins", "Away Wins", "Home Matches", "Away Matches"]
     },
 
@@ -405,6 +514,16 @@ ANALYTICS_QUERIES = {
         WHERE (bp1.runs_scored + bp2.runs_scored) >= 100
         ORDER BY (bp1.runs_scored + bp2.runs_scored) DESC;
         """,
+        "view_sql": """
+        SELECT 
+            batsman_1 AS "Batsman 1",
+            batsman_2 AS "Batsman 2",
+            partnership_runs AS "Partnership Runs",
+            CONCAT('Innings ', innings_number) AS "Innings",
+            match_description AS "Match"
+        FROM mv_batting_partnerships
+        ORDER BY partnership_runs DESC;
+        """,
         "expected_columns": ["Batsman 1", "Batsman 2", "Partnership Runs", "Innings", "Match"]
     },
 
@@ -465,6 +584,15 @@ ANALYTICS_QUERIES = {
         WHERE pcms.close_matches_played > 0
         ORDER BY pcms.avg_runs DESC;
         """,
+        "view_sql": """
+        SELECT 
+            player_name AS "Player Name",
+            ROUND(avg_runs, 2) AS "Average Runs in Close Matches",
+            close_matches_played AS "Close Matches Played",
+            wins_when_batted AS "Close Match Wins When Batted"
+        FROM mv_close_match_batting
+        ORDER BY avg_runs DESC;
+        """,
         "expected_columns": ["Player Name", "Average Runs in Close Matches", "Close Matches Played", "Close Match Wins When Batted"]
     },
 
@@ -487,6 +615,16 @@ ANALYTICS_QUERIES = {
         HAVING COUNT(bp.match_id) >= 5
         ORDER BY p.player_name, EXTRACT(YEAR FROM m.match_date) DESC;
         """,
+        "view_sql": """
+        SELECT 
+            player_name AS "Player Name",
+            year AS "Year",
+            avg_runs AS "Average Runs per Match",
+            avg_strike_rate AS "Average Strike Rate",
+            matches_played AS "Matches Played"
+        FROM mv_yearly_batting_trends
+        ORDER BY player_name, year DESC;
+        """,
         "expected_columns": ["Player Name", "Year", "Average Runs per Match", "Average Strike Rate", "Matches Played"]
     }
 }
@@ -502,6 +640,97 @@ def get_filtered_queries():
 
 filtered_queries = get_filtered_queries()
 
+def selected_sql(query_num, query_info):
+    """SQL the query's materialized-view toggle currently selects"""
+    if "view_sql" in query_info and st.session_state.get(f"mv_{query_num}", True):
+        return query_info["view_sql"]
+    return query_info["sql"]
+
+def run_batch_query(query_num, query_sql, batch_start, slots):
+    """Run one query of a batch on its own pooled connection (worker thread, no st.* calls)"""
+    record = {"Query": f"Q{query_num}", "Rows": 0, "Error": None,
+              "start": 0.0, "execute": 0.0, "fetch": 0.0, "build": 0.0}
+    with slots:
+        conn = get_connection(role="analytics", database="analytics")
+        if not conn:
+            record["Error"] = "Database connection failed"
+            return record
+        try:
+            timings = {}
+            record["start"] = time.perf_counter() - batch_start
+            df = run_query(conn, query_sql, timings)
+            record.update(timings, Rows=len(df))
+        except Exception as e:
+            record["Error"] = str(e)
+        finally:
+            conn.close()
+    return record
+
+def run_batch(queries):
+    """Run the queries concurrently; returns (records, wall clock seconds)"""
+    batch_start = time.perf_counter()
+    slots = batch_slots()
+    with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(queries)), thread_name_prefix="analytics") as pool:
+        futures = [pool.submit(run_batch_query, num, selected_sql(num, info), batch_start, slots)
+                   for num, info in queries.items()]
+        records = [f.result() for f in futures]
+    return records, time.perf_counter() - batch_start
+
+def waterfall_chart(records):
+    """Horizontal bars of each query's execute, fetch and DataFrame-build phases on one timeline"""
+    segments = []
+    for r in records:
+        offset = r["start"]
+        for phase in ("execute", "fetch", "build"):
+            segments.append({"Query": r["Query"], "Phase": phase,
+                             "From (ms)": round(offset * 1000, 2),
+                             "To (ms)": round((offset + r[phase]) * 1000, 2),
+                             "Duration (ms)": round(r[phase] * 1000, 2)})
+            offset += r[phase]
+    return alt.Chart(pd.DataFrame(segments)).mark_bar().encode(
+        x=alt.X("From (ms):Q", title="Milliseconds since batch start"),
+        x2="To (ms):Q",
+        y=alt.Y("Query:N", sort=[r["Query"] for r in records]),
+        color=alt.Color("Phase:N", sort=["execute", "fetch", "build"]),
+        tooltip=["Query", "Phase", "Duration (ms)"],
+    )
+
+# Batch mode: every filtered query at once, as a smoke test and timing check
+if st.button(f"⚡ Run all (filtered) - {len(filtered_queries)} queries", type="primary"):
+    with st.spinner(f"⏳ Running {len(filtered_queries)} queries on {min(BATCH_WORKERS, len(filtered_queries))} connections..."):
+        records, wall_clock = run_batch(filtered_queries)
+
+    failed = [r for r in records if r["Error"]]
+    serial = sum(r["execute"] + r["fetch"] + r["build"] for r in records)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total wall clock", f"{wall_clock * 1000:.1f}ms")
+    col2.metric("Sum of query times", f"{serial * 1000:.1f}ms")
+    col3.metric("Succeeded", f"{len(records) - len(failed)}/{len(records)}")
+    for r in failed:
+        st.error(f"❌ {r['Query']} failed: {r['Error']}")
+
+    st.altair_chart(waterfall_chart(records), use_container_width=True)
+    st.dataframe(
+        pd.DataFrame([{
+            "Query": r["Query"], "Rows": r["Rows"],
+            "Execute (ms)": round(r["execute"] * 1000, 2),
+            "Fetch (ms)": round(r["fetch"] * 1000, 2),
+            "Build (ms)": round(r["build"] * 1000, 2),
+            "Status": "❌ " + r["Error"] if r["Error"] else "✅",
+        } for r in records]),
+        use_container_width=True,
+        hide_index=True
+    )
+    st.markdown("---")
+
+# Queries whose latest profiled run regressed
+if profiling_mode:
+    regressions = plan_history().regressions()
+    if regressions:
+        with st.expander(f"📉 {len(regressions)} queries regressed in their latest profiled run", expanded=True):
+            for qid, flags in sorted(regressions.items()):
+                st.markdown(f"- **Q{qid}**: {', '.join(flags)}")
+
 # Display analytics queries
 for query_num, query_info in filtered_queries.items():
     st.markdown('<div class="query-section">', unsafe_allow_html=True)
@@ -518,14 +747,24 @@ for query_num, query_info in filtered_queries.items():
     
     st.markdown(f"**Description:** {query_info['description']}")
     
+    # Heavy queries can read a materialized view the ETL keeps refreshed
+    query_sql, query_id = query_info["sql"], query_num
+    if "view_sql" in query_info:
+        view = source_tables(query_info["view_sql"])[0]
+        if st.toggle("🗂️ Read from materialized view", value=True, key=f"mv_{query_num}",
+                     help=f"Use {view} instead of joining the live tables"):
+            query_sql, query_id = query_info["view_sql"], f"{query_num}:view"
+            refreshed_at = load_view_refreshes().get(view)
+            st.caption(f"{view} last refreshed: {refreshed_at or 'unknown'}")
+    
     # Show/Hide SQL code
     with st.expander(f"📝 View SQL Code - Query {query_num}"):
-        st.markdown(f'<div class="sql-code">{query_info["sql"]}</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="sql-code">{query_sql}</div>', unsafe_allow_html=True)
     
     # Execute query button
     if st.button(f"🚀 Execute Query {query_num}", key=f"exec_{query_num}", type="secondary"):
         with st.spinner(f"⏳ Executing Query {query_num}..."):
-            result, exec_time = execute_analytics_query(query_info["sql"], query_info["title"])
+            result, exec_time = execute_analytics_query(query_sql, query_info["title"], query_id)
             
             if result is not None:
                 # Show summary
@@ -569,6 +808,9 @@ st.sidebar.metric("Total Queries", total_queries)
 st.sidebar.metric("Beginner Level", beginner_count)
 st.sidebar.metric("Intermediate Level", intermediate_count)
 
+with st.sidebar.expander("⚡ Result cache"):
+    st.json(result_cache().stats())
+
 # Footer
 st.markdown("---")
 st.markdown("*📊 Advanced SQL analytics for comprehensive cricket data insights*")
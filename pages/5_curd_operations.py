@@ -1,7 +1,10 @@
 import streamlit as st
 from sqlalchemy import text
 from utils.db_connection import get_connection
+from utils.key_cache import player_ids, team_ids
+from utils.change_events import notify_change
 import pandas as pd
+import re
 
 st.set_page_config(page_title="CRUD Operations | Cricbuzz", layout="wide", page_icon="🛠️")
 
@@ -70,6 +73,34 @@ if not conn:
     st.error("❌ Database connection failed. Please check your database configuration.")
     st.stop()
 
+# Tables whose rows a DELETE also touches through ON DELETE CASCADE / SET NULL
+DEPENDENT_TABLES = {
+    "players": ["batting_stats", "bowling_stats"],
+    "teams": ["match_scores"],
+    "venues": ["matches"],
+    "matches": ["match_scores"],
+}
+
+def changed_tables(query):
+    match = re.match(r"\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+(\w+)", query, re.IGNORECASE)
+    if not match:
+        return []
+    table = match.group(1).lower()
+    if query.lstrip().upper().startswith("DELETE"):
+        return [table] + DEPENDENT_TABLES.get(table, [])
+    return [table]
+
+# Keep match_summary in step with writes to the tables it is built from
+def refresh_summary(tables, match_ids):
+    if match_ids and set(tables) & {"matches", "match_scores"}:
+        conn.execute(text("SELECT refresh_match_summary(CAST(:ids AS bigint[]))"), {"ids": match_ids})
+    elif set(tables) & {"teams", "venues", "matches", "match_scores"}:
+        # Renames and cascading deletes can touch any match; these are rare admin edits
+        conn.execute(text("SELECT refresh_match_summary(NULL)"))
+    else:
+        return []
+    return ["match_summary"]
+
 # Helper function to execute queries safely
 def execute_query(query, params=None, fetch=False):
     try:
@@ -81,6 +112,12 @@ def execute_query(query, params=None, fetch=False):
         if fetch:
             return result.fetchall(), result.keys()
         else:
+            # Tell the dashboard's change listener which cached reads are now stale
+            tables = changed_tables(query)
+            if tables:
+                match_ids = [params["match_id"]] if params and "match_id" in params else []
+                tables += refresh_summary(tables, match_ids)
+                notify_change(conn, tables, match_ids, source="crud")
             conn.commit()
             return True, None
     except Exception as e:
@@ -180,6 +217,7 @@ if table_choice == "Players":
                 if st.button("✅ Yes, Delete", type="primary"):
                     success, error = execute_query("DELETE FROM players WHERE name=:name", {"name": del_name})
                     if success:
+                        player_ids.invalidate(del_name)
                         st.success(f"✅ Player '{del_name}' deleted successfully!")
                         if 'confirm_delete_player' in st.session_state:
                             del st.session_state.confirm_delete_player
@@ -247,6 +285,7 @@ elif table_choice == "Teams":
                         {"new_name": new_name.strip(), "old_name": selected_team}
                     )
                     if success:
+                        team_ids.invalidate(selected_team)
                         st.success(f"✅ Team updated successfully!")
                         st.rerun()
                     else:
@@ -269,6 +308,7 @@ elif table_choice == "Teams":
                 if st.button("✅ Confirm Delete", type="primary"):
                     success, error = execute_query("DELETE FROM teams WHERE team_name=:name", {"name": del_team})
                     if success:
+                        team_ids.invalidate(del_team)
                         st.success(f"✅ Team '{del_team}' deleted successfully!")
                         if 'confirm_delete_team' in st.session_state:
                             del st.session_state.confirm_delete_team
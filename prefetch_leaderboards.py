@@ -0,0 +1,76 @@
+import time
+import logging
+import argparse
+from urllib.parse import urlencode
+from dotenv import load_dotenv
+from utils.db_connection import get_connection
+from utils.key_cache import player_ids
+from utils.async_fetcher import fetch_all
+from utils.leaderboards import FORMATS, STAT_TYPES_PATH, LEADERBOARD_PATH, parse_stat_types, store_leaderboard
+
+# Load environment variables
+load_dotenv()
+
+log = logging.getLogger("etl")
+
+
+def leaderboard_path(stat_type, format_type):
+    return f"{LEADERBOARD_PATH}?{urlencode({'statsType': stat_type, 'formatType': format_type})}"
+
+
+def prefetch(formats=FORMATS):
+    """Fetch every stat type x format leaderboard concurrently and store them all."""
+    start = time.perf_counter()
+    stat_types = fetch_all([STAT_TYPES_PATH])[STAT_TYPES_PATH]
+    if isinstance(stat_types, Exception):
+        log.error("❌ Could not fetch stat types: %s", stat_types)
+        return
+    stat_types = parse_stat_types(stat_types)
+
+    # Concurrency and the shared API rate limit are handled by fetch_all()
+    paths = {leaderboard_path(t["value"], f): (t, f) for t in stat_types for f in formats}
+    results = fetch_all(paths)
+
+    conn = get_connection(role="etl")
+    if not conn:
+        log.error("❌ DB connection failed.")
+        return
+
+    stored = players = 0
+    try:
+        for path, data in results.items():
+            stat, format_type = paths[path]
+            if isinstance(data, Exception):
+                log.error("❌ Leaderboard fetch failed for %s/%s: %s", stat["value"], format_type, data)
+                continue
+            try:
+                players += store_leaderboard(conn, stat, format_type, data)
+                conn.commit()
+                stored += 1
+            except Exception as e:
+                conn.rollback()
+                player_ids.invalidate()
+                log.error("❌ Error storing leaderboard %s/%s: %s", stat["value"], format_type, e)
+    finally:
+        conn.close()
+
+    log.info("🏆 Stored %d/%d leaderboards (%d player stats) in %.2fs",
+             stored, len(paths), players, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prefetch every Cricbuzz leaderboard into the database")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="comma-separated formats to fetch")
+    parser.add_argument("--every", type=int, help="keep running and refetch every this many seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    while True:
+        prefetch(formats)
+        if not args.every:
+            break
+        try:
+            time.sleep(args.every)
+        except KeyboardInterrupt:
+            break
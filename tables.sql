@@ -2,7 +2,7 @@
 CREATE TABLE teams (
     team_id SERIAL PRIMARY KEY,
     team_name VARCHAR(100) UNIQUE NOT NULL,
-    country VARCHAR(100) NOT NULL,
+    country VARCHAR(100), -- NULL for teams loaded from scorecards (franchises have none)
     team_type VARCHAR(20) DEFAULT 'International', -- International, Domestic, etc.
     created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -21,8 +21,9 @@ CREATE TABLE venues (
 -- Players table
 CREATE TABLE players (
     player_id SERIAL PRIMARY KEY,
+    cricbuzz_player_id BIGINT UNIQUE, -- batId/bowlerId of players loaded from scorecards
     player_name VARCHAR(200) NOT NULL,
-    country VARCHAR(100) NOT NULL,
+    country VARCHAR(100), -- NULL for players loaded from scorecards
     playing_role VARCHAR(50), -- Batsman, Bowler, All-rounder, Wicket-keeper
     batting_style VARCHAR(50), -- Right-handed, Left-handed
     bowling_style VARCHAR(100), -- Right-arm fast, Left-arm spin, etc.
@@ -118,6 +119,79 @@ CREATE INDEX idx_players_role ON players(playing_role);
 CREATE INDEX idx_venues_country ON venues(country);
 CREATE INDEX idx_series_start_date ON series(start_date);
 
+-- Data versions: one counter per table, bumped once by every transaction that changes its rows.
+-- Cached analytics results are keyed on the versions of their source tables.
+CREATE TABLE data_versions (
+    table_name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Statement-level, so a COPY or bulk upsert costs one call; statements that changed
+-- no rows return early. The transaction-local setting keeps it to one bump per table
+-- per transaction, so the counter row is updated (and locked) once.
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM 1 FROM old_rows LIMIT 1;
+        IF NOT FOUND THEN
+            RETURN NULL;
+        END IF;
+    ELSIF TG_OP <> 'TRUNCATE' THEN
+        PERFORM 1 FROM new_rows LIMIT 1;
+        IF NOT FOUND THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    IF current_setting('data_versions.' || TG_TABLE_NAME, true) IS NOT DISTINCT FROM txid_current()::text THEN
+        RETURN NULL;
+    END IF;
+    PERFORM set_config('data_versions.' || TG_TABLE_NAME, txid_current()::text, true);
+
+    INSERT INTO data_versions (table_name, version, changed_at)
+    VALUES (TG_TABLE_NAME, 1, CURRENT_TIMESTAMP)
+    ON CONFLICT (table_name) DO UPDATE
+    SET version = data_versions.version + 1, changed_at = EXCLUDED.changed_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Tells the result caches' listeners about every new version once it commits
+CREATE OR REPLACE FUNCTION notify_data_version() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('data_versions', json_build_object('table', NEW.table_name, 'version', NEW.version)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_data_versions_notify
+AFTER INSERT OR UPDATE ON data_versions
+FOR EACH ROW EXECUTE FUNCTION notify_data_version();
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['teams', 'venues', 'players', 'series', 'matches',
+                             'match_results', 'batting_performances', 'bowling_performances']
+    LOOP
+        INSERT INTO data_versions (table_name) VALUES (t) ON CONFLICT DO NOTHING;
+        -- Transition tables need one trigger per event
+        EXECUTE format('CREATE TRIGGER trg_%s_data_version_insert AFTER INSERT ON %I '
+                       'REFERENCING NEW TABLE AS new_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()', t, t);
+        EXECUTE format('CREATE TRIGGER trg_%s_data_version_update AFTER UPDATE ON %I '
+                       'REFERENCING NEW TABLE AS new_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()', t, t);
+        EXECUTE format('CREATE TRIGGER trg_%s_data_version_delete AFTER DELETE ON %I '
+                       'REFERENCING OLD TABLE AS old_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()', t, t);
+        EXECUTE format('CREATE TRIGGER trg_%s_data_version_truncate AFTER TRUNCATE ON %I '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()', t, t);
+    END LOOP;
+END $$;
+
 -- Insert sample data for testing
 
 -- Insert Teams
@@ -245,4 +319,110 @@ UPDATE players SET
     career_runs = (SELECT COALESCE(SUM(runs_scored), 0) FROM batting_performances WHERE player_id = players.player_id),
     career_wickets = (SELECT COALESCE(SUM(wickets_taken), 0) FROM bowling_performances WHERE player_id = players.player_id);
 
+-- Materialized views behind the heavy analytics queries (Q11, Q12, Q13, Q15, Q16).
+-- Each has a unique index so it can be refreshed CONCURRENTLY while the page reads it;
+-- utils/analytics_views.py refreshes only the views whose source tables changed.
+CREATE TABLE analytics_view_refreshes (
+    view_name VARCHAR(63) PRIMARY KEY,
+    source_versions JSONB NOT NULL,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    duration_ms NUMERIC(10,1)
+);
+
+-- Q11: runs per format for players who have batted in at least two formats
+CREATE MATERIALIZED VIEW mv_multi_format_players AS
+SELECT
+    p.player_id,
+    p.player_name,
+    SUM(CASE WHEN m.match_type = 'Test' THEN bp.runs_scored ELSE 0 END) AS test_runs,
+    SUM(CASE WHEN m.match_type = 'ODI' THEN bp.runs_scored ELSE 0 END) AS odi_runs,
+    SUM(CASE WHEN m.match_type = 'T20I' THEN bp.runs_scored ELSE 0 END) AS t20i_runs,
+    ROUND(AVG(bp.runs_scored), 2) AS overall_average
+FROM players p
+JOIN batting_performances bp ON p.player_id = bp.player_id
+JOIN matches m ON bp.match_id = m.match_id
+GROUP BY p.player_id, p.player_name
+HAVING COUNT(DISTINCT m.match_type) >= 2;
+CREATE UNIQUE INDEX idx_mv_multi_format_players_pk ON mv_multi_format_players(player_id);
+CREATE INDEX idx_mv_multi_format_players_avg ON mv_multi_format_players(overall_average DESC);
+
+-- Q12: home and away record per team
+CREATE MATERIALIZED VIEW mv_home_away_records AS
+WITH team_match_location AS (
+    SELECT m.match_id, t.team_id, t.team_name,
+           CASE WHEN t.country = v.country THEN 'Home' ELSE 'Away' END AS location,
+           mr.winning_team_id
+    FROM matches m
+    JOIN teams t ON t.team_id IN (m.team1_id, m.team2_id)
+    LEFT JOIN venues v ON m.venue_id = v.venue_id
+    LEFT JOIN match_results mr ON m.match_id = mr.match_id
+)
+SELECT
+    team_name,
+    SUM(CASE WHEN location = 'Home' AND team_id = winning_team_id THEN 1 ELSE 0 END) AS home_wins,
+    SUM(CASE WHEN location = 'Away' AND team_id = winning_team_id THEN 1 ELSE 0 END) AS away_wins,
+    COUNT(CASE WHEN location = 'Home' THEN 1 END) AS home_matches,
+    COUNT(CASE WHEN location = 'Away' THEN 1 END) AS away_matches
+FROM team_match_location
+GROUP BY team_name;
+CREATE UNIQUE INDEX idx_mv_home_away_records_pk ON mv_home_away_records(team_name);
+
+-- Q13: consecutive batters whose combined runs reach 100
+CREATE MATERIALIZED VIEW mv_batting_partnerships AS
+SELECT
+    bp1.performance_id AS first_performance_id,
+    bp2.performance_id AS second_performance_id,
+    p1.player_name AS batsman_1,
+    p2.player_name AS batsman_2,
+    bp1.runs_scored + bp2.runs_scored AS partnership_runs,
+    bp1.innings_number,
+    m.match_description
+FROM batting_performances bp1
+JOIN batting_performances bp2 ON bp1.match_id = bp2.match_id
+    AND bp1.innings_number = bp2.innings_number
+    AND bp1.team_id = bp2.team_id
+    AND bp2.batting_position = bp1.batting_position + 1
+JOIN players p1 ON bp1.player_id = p1.player_id
+JOIN players p2 ON bp2.player_id = p2.player_id
+JOIN matches m ON bp1.match_id = m.match_id
+WHERE bp1.runs_scored + bp2.runs_scored >= 100;
+CREATE UNIQUE INDEX idx_mv_batting_partnerships_pk ON mv_batting_partnerships(first_performance_id, second_performance_id);
+CREATE INDEX idx_mv_batting_partnerships_runs ON mv_batting_partnerships(partnership_runs DESC);
+
+-- Q15: batting in matches won by under 50 runs or 5 wickets
+CREATE MATERIALIZED VIEW mv_close_match_batting AS
+SELECT
+    bp.player_id,
+    bp.team_id,
+    p.player_name,
+    AVG(bp.runs_scored) AS avg_runs,
+    COUNT(bp.match_id) AS close_matches_played,
+    SUM(CASE WHEN bp.team_id = mr.winning_team_id THEN 1 ELSE 0 END) AS wins_when_batted
+FROM batting_performances bp
+JOIN match_results mr ON bp.match_id = mr.match_id
+JOIN players p ON bp.player_id = p.player_id
+WHERE (mr.victory_type = 'runs' AND mr.victory_margin < 50)
+   OR (mr.victory_type = 'wickets' AND mr.victory_margin < 5)
+GROUP BY bp.player_id, bp.team_id, p.player_name;
+CREATE UNIQUE INDEX idx_mv_close_match_batting_pk ON mv_close_match_batting(player_id, team_id);
+CREATE INDEX idx_mv_close_match_batting_avg ON mv_close_match_batting(avg_runs DESC);
+
+-- Q16: yearly batting since 2020 for players with at least 5 innings in the year
+CREATE MATERIALIZED VIEW mv_yearly_batting_trends AS
+SELECT
+    p.player_id,
+    p.player_name,
+    EXTRACT(YEAR FROM m.match_date)::INT AS year,
+    ROUND(AVG(bp.runs_scored), 2) AS avg_runs,
+    ROUND(AVG(bp.strike_rate), 2) AS avg_strike_rate,
+    COUNT(bp.match_id) AS matches_played
+FROM players p
+JOIN batting_performances bp ON p.player_id = bp.player_id
+JOIN matches m ON bp.match_id = m.match_id
+WHERE m.match_date >= '2020-01-01'
+GROUP BY p.player_id, p.player_name, EXTRACT(YEAR FROM m.match_date)
+HAVING COUNT(bp.match_id) >= 5;
+CREATE UNIQUE INDEX idx_mv_yearly_batting_trends_pk ON mv_yearly_batting_trends(player_id, year);
+CREATE INDEX idx_mv_yearly_batting_trends_name ON mv_yearly_batting_trends(player_name, year DESC);
+
 COMMIT;
\ No newline at end of file
@@ -0,0 +1,61 @@
+import time
+from types import SimpleNamespace
+import pytest
+from utils import cricbuzz_api
+from utils.cricbuzz_api import ApiError, CircuitBreaker, CircuitOpenError, CricbuzzClient, RetryPolicy
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker(threshold=1, reset_after=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.state == "half-open"
+    return breaker
+
+
+def test_trial_ending_in_4xx_closes_the_circuit():
+    breaker = half_open_breaker()
+    with pytest.raises(ApiError):
+        with breaker.attempt():
+            raise ApiError(404, "not found")
+    assert breaker.state == "closed"
+    breaker.check()
+
+
+def test_trial_ending_in_unexpected_exception_reopens_the_circuit():
+    breaker = half_open_breaker()
+    with pytest.raises(ValueError):
+        with breaker.attempt():
+            raise ValueError("bad payload")
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_only_one_trial_while_half_open():
+    breaker = half_open_breaker()
+    with breaker.attempt():
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+    assert breaker.state == "closed"
+
+
+class FakeSession:
+    def __init__(self, status):
+        self.status = status
+
+    def get(self, url, **kwargs):
+        return SimpleNamespace(status_code=self.status, text="nope", headers={})
+
+
+def test_client_4xx_during_trial_does_not_leave_the_circuit_stuck(monkeypatch):
+    breaker = half_open_breaker()
+    monkeypatch.setattr(cricbuzz_api, "breaker", breaker)
+    monkeypatch.setattr(cricbuzz_api.api_bucket, "acquire", lambda tokens=1: None)
+    client = CricbuzzClient(policy=RetryPolicy(max_retries=2, backoff=0))
+    client.session = FakeSession(404)
+
+    with pytest.raises(ApiError) as raised:
+        client.get("/mcenter/v1/1/scard")
+    assert raised.value.status == 404
+    assert breaker.state == "closed"
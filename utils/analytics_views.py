@@ -0,0 +1,96 @@
+import json
+import time
+import logging
+from sqlalchemy import text
+from utils.db_connection import get_connection
+
+log = logging.getLogger("analytics_views")
+
+# Materialized view -> the tables it reads (see tables.sql)
+MATERIALIZED_VIEWS = {
+    "mv_multi_format_players": ("players", "batting_performances", "matches"),
+    "mv_home_away_records": ("teams", "venues", "matches", "match_results"),
+    "mv_batting_partnerships": ("players", "batting_performances", "matches"),
+    "mv_close_match_batting": ("players", "batting_performances", "match_results"),
+    "mv_yearly_batting_trends": ("players", "batting_performances", "matches"),
+}
+
+
+def source_versions(conn):
+    """{view: {table: version}} of every view's source tables as they are now."""
+    versions = dict(conn.execute(text("SELECT table_name, version FROM data_versions")).fetchall())
+    return {view: {t: versions.get(t, 0) for t in tables} for view, tables in MATERIALIZED_VIEWS.items()}
+
+
+def stale_views(conn):
+    """{view: current source versions} for views refreshed before their sources last changed."""
+    refreshed = dict(conn.execute(
+        text("SELECT view_name, source_versions FROM analytics_view_refreshes")
+    ).fetchall())
+    return {view: current for view, current in source_versions(conn).items() if refreshed.get(view) != current}
+
+
+def refresh_stale_views(conn, force=False):
+    """REFRESH MATERIALIZED VIEW CONCURRENTLY for each view whose source tables changed.
+
+    Versions are read before refreshing, so a write that lands during a
+    refresh leaves the view stale for the next run. Each view is committed
+    on its own. Returns the names of the views refreshed.
+    """
+    stale = source_versions(conn) if force else stale_views(conn)
+    conn.commit()
+
+    refreshed = []
+    for view, versions in stale.items():
+        start = time.perf_counter()
+        try:
+            conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+            elapsed = (time.perf_counter() - start) * 1000
+            conn.execute(
+                text("""
+                INSERT INTO analytics_view_refreshes (view_name, source_versions, refreshed_at, duration_ms)
+                VALUES (:view, CAST(:versions AS jsonb), CURRENT_TIMESTAMP, :ms)
+                ON CONFLICT (view_name) DO UPDATE
+                SET source_versions = EXCLUDED.source_versions, refreshed_at = EXCLUDED.refreshed_at,
+                    duration_ms = EXCLUDED.duration_ms
+                """),
+                {"view": view, "versions": json.dumps(versions), "ms": round(elapsed, 1)},
+            )
+            # The view's own version, so results cached from it are replaced too
+            conn.execute(
+                text("""
+                INSERT INTO data_versions (table_name, version, changed_at) VALUES (:view, 1, CURRENT_TIMESTAMP)
+                ON CONFLICT (table_name) DO UPDATE
+                SET version = data_versions.version + 1, changed_at = EXCLUDED.changed_at
+                """),
+                {"view": view},
+            )
+            conn.commit()
+            refreshed.append(view)
+            log.info("🔄 Refreshed %s in %.1fms", view, elapsed)
+        except Exception as e:
+            conn.rollback()
+            log.error("❌ Refresh of %s failed: %s", view, e)
+    return refreshed
+
+
+def refresh_views(force=False):
+    """refresh_stale_views() on an ETL connection to the analytics database; called at the end of ETL runs."""
+    conn = get_connection(role="etl", database="analytics")
+    if not conn:
+        log.error("❌ Analytics DB connection failed; materialized views not refreshed.")
+        return []
+    try:
+        return refresh_stale_views(conn, force=force)
+    except Exception as e:
+        conn.rollback()
+        log.error("❌ Materialized view refresh failed: %s", e)
+        return []
+    finally:
+        conn.close()
+
+
+def view_refreshes(conn):
+    """{view: refreshed_at} of the last refresh of each view."""
+    return dict(conn.execute(text("SELECT view_name, refreshed_at FROM analytics_view_refreshes")).fetchall())
+
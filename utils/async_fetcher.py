@@ -0,0 +1,92 @@
+import os
+import time
+import asyncio
+import logging
+import aiohttp
+from utils.rate_limit import api_bucket
+from utils.cricbuzz_api import ApiError, RETRY_STATUSES, breaker, latency, retry_policy, default_headers, base_url
+
+log = logging.getLogger("etl")
+
+MAX_CONCURRENCY = int(os.getenv("RAPIDAPI_MAX_CONCURRENCY", "16"))
+
+# Match-list feeds that share the /matches/v1/live payload shape
+MATCH_FEEDS = {
+    "live": "/matches/v1/live",
+    "recent": "/matches/v1/recent",
+    "upcoming": "/matches/v1/upcoming",
+}
+
+
+def scorecard_path(match_id):
+    return f"/mcenter/v1/{match_id}/scard"
+
+
+async def _fetch(session, semaphore, root, path):
+    """GET one path with the blocking client's retry policy, circuit breaker and latency stats."""
+    error = None
+    for attempt in range(retry_policy.max_retries + 1):
+        await asyncio.sleep(api_bucket.reserve())
+        retry_after = None
+        async with semaphore:
+            try:
+                with breaker.attempt():
+                    with latency.timed(path, retry=attempt > 0) as call:
+                        async with session.get(root + path) as response:
+                            if response.status == 200:
+                                payload = await response.json(content_type=None)
+                                call.ok = True
+                            else:
+                                body = await response.text()
+                                retry_after = response.headers.get("Retry-After")
+                    if call.ok:
+                        return payload
+                    raise ApiError(response.status, body, path)
+            except ApiError as e:
+                if e.status not in RETRY_STATUSES:
+                    raise
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+
+        if attempt < retry_policy.max_retries:
+            delay = retry_policy.delay(attempt, retry_after)
+            log.warning("Retrying %s in %.2fs after: %s", path, delay, error)
+            await asyncio.sleep(delay)
+    raise error
+
+
+async def fetch_many(paths, concurrency=MAX_CONCURRENCY):
+    """Fetch every path concurrently over one keep-alive connection pool.
+
+    Returns {path: payload}; a failed path maps to the exception it raised.
+    """
+    headers = default_headers()
+    root = base_url()
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=20)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession(headers=headers, connector=connector, timeout=timeout) as session:
+        results = await asyncio.gather(
+            *(_fetch(session, semaphore, root, path) for path in paths),
+            return_exceptions=True,
+        )
+    return dict(zip(paths, results))
+
+
+def fetch_all(paths, concurrency=MAX_CONCURRENCY):
+    """Blocking wrapper around fetch_many() for the ETL scripts."""
+    start = time.perf_counter()
+    results = asyncio.run(fetch_many(list(paths), concurrency))
+    failed = sum(isinstance(r, Exception) for r in results.values())
+    log.info("🌐 Fetched %d/%d endpoints in %.2fs",
+             len(results) - failed, len(results), time.perf_counter() - start)
+    return results
+
+
+def fetch_scorecards(match_ids, concurrency=MAX_CONCURRENCY):
+    """Fetch the scorecard of every match concurrently; returns {match_id: payload}."""
+    paths = {scorecard_path(mid): mid for mid in match_ids}
+    results = fetch_all(paths, concurrency)
+    return {paths[p]: r for p, r in results.items()}
@@ -0,0 +1,39 @@
+import json
+from sqlalchemy import text
+
+CHANNEL = "cricbuzz_changes"
+
+# Keeps every payload well under Postgres' 8000 byte NOTIFY limit
+MATCH_IDS_PER_MESSAGE = 500
+
+
+def notify_change(conn, tables, match_ids=(), source="etl"):
+    """Queue change notifications on conn's transaction.
+
+    Postgres only delivers NOTIFY on commit, so listeners never hear about
+    writes that were rolled back.
+    """
+    ids = sorted(set(match_ids))
+    chunks = [ids[i:i + MATCH_IDS_PER_MESSAGE] for i in range(0, len(ids), MATCH_IDS_PER_MESSAGE)] or [[]]
+    payloads = [
+        json.dumps({"source": source, "tables": sorted(set(tables)), "match_ids": chunk}, separators=(",", ":"))
+        for chunk in chunks
+    ]
+    conn.execute(
+        text("SELECT pg_notify(:channel, p) FROM unnest(CAST(:payloads AS text[])) AS p"),
+        {"channel": CHANNEL, "payloads": payloads},
+    )
+
+
+def listen_connection(conn, channel=CHANNEL):
+    """Detach conn from its pool and LISTEN on channel; returns the raw psycopg2 connection.
+
+    Callers wait on it with select()/add_reader() and drain raw.notifies
+    after raw.poll(). Closing conn closes the underlying connection.
+    """
+    conn.detach()
+    raw = conn.connection.dbapi_connection
+    raw.autocommit = True
+    with raw.cursor() as cursor:
+        cursor.execute(f"LISTEN {channel}")
+    return raw
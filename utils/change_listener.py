@@ -0,0 +1,74 @@
+import json
+import time
+import select
+import logging
+import threading
+from collections import defaultdict
+import streamlit as st
+from utils.db_connection import get_connection
+from utils.change_events import listen_connection
+
+log = logging.getLogger("dashboard")
+
+_versions = defaultdict(int)
+_lock = threading.Lock()
+
+
+def _bump(tables):
+    with _lock:
+        for table in tables:
+            _versions[table] += 1
+
+
+def _bump_all():
+    # Notifications sent while we were disconnected are lost, so assume everything changed
+    with _lock:
+        for table in list(_versions):
+            _versions[table] += 1
+
+
+def _listen_forever():
+    while True:
+        conn = None
+        try:
+            conn = get_connection()
+            if not conn:
+                raise RuntimeError("DB connection failed")
+            # Keep this connection out of the pool for the lifetime of the listener
+            raw = listen_connection(conn)
+            _bump_all()
+
+            while True:
+                if select.select([raw], [], [], 30) == ([], [], []):
+                    continue
+                raw.poll()
+                while raw.notifies:
+                    notify = raw.notifies.pop(0)
+                    try:
+                        _bump(json.loads(notify.payload).get("tables", []))
+                    except ValueError:
+                        _bump_all()
+        except Exception as e:
+            log.warning("Change listener disconnected: %s", e)
+            if conn is not None:
+                conn.close()
+            time.sleep(5)
+
+
+@st.cache_resource
+def _start_listener():
+    thread = threading.Thread(target=_listen_forever, name="cricbuzz-change-listener", daemon=True)
+    thread.start()
+    return thread
+
+
+def data_version(*tables):
+    """Change counters for the given tables, bumped by the ETL/CRUD NOTIFY messages.
+
+    Pass the result as an argument of an st.cache_data function: cached
+    results are then keyed on the data they read, so they can be kept
+    indefinitely and are recomputed only after one of their tables changed.
+    """
+    _start_listener()
+    with _lock:
+        return tuple(_versions[t] for t in tables)
@@ -0,0 +1,38 @@
+import os
+import streamlit as st
+from sqlalchemy import text
+from utils.db_connection import get_connection
+from utils.change_listener import data_version
+
+# Upper bound on staleness if the change listener misses a notification
+COUNTERS_TTL = int(os.getenv("DASHBOARD_COUNTERS_TTL", "30"))
+
+# counter -> table whose triggers maintain it
+COUNTER_TABLES = {
+    "total_matches": "matches",
+    "total_players": "players",
+    "active_matches": "match_scores",
+    "batting_records": "batting_stats",
+    "bowling_records": "bowling_stats",
+}
+
+
+@st.cache_data(ttl=COUNTERS_TTL, max_entries=16, show_spinner=False)
+def _load_counters(names, version):
+    conn = get_connection()
+    if not conn:
+        raise ConnectionError("DB connection failed")
+    try:
+        rows = conn.execute(
+            text("SELECT counter, value FROM dashboard_counters WHERE counter = ANY(:names)"),
+            {"names": list(names)},
+        ).fetchall()
+    finally:
+        conn.close()
+    values = dict(rows)
+    return {name: values.get(name, 0) for name in names}
+
+
+def get_counters(*names):
+    """Trigger-maintained row counts from dashboard_counters, e.g. get_counters("total_players")."""
+    return _load_counters(names, data_version(*(COUNTER_TABLES[n] for n in names)))
@@ -0,0 +1,264 @@
+import os
+import re
+import time
+import random
+import logging
+import threading
+from types import SimpleNamespace
+from contextlib import contextmanager
+from collections import defaultdict, deque
+import requests
+from requests.adapters import HTTPAdapter
+from utils.rate_limit import api_bucket
+
+log = logging.getLogger("cricbuzz_api")
+
+DEFAULT_BASE_URL = "https://cricbuzz-cricket.p.rapidapi.com"
+API_HOST = "cricbuzz-cricket.p.rapidapi.com"
+
+# Upstream answers worth retrying; other 4xx are the caller's fault and fail at once
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ApiError(Exception):
+    def __init__(self, status, body, path=None):
+        super().__init__(f"API Error {status}" + (f" for {path}" if path else "") + f": {body[:200]}")
+        self.status = status
+
+
+class CircuitOpenError(ApiError):
+    def __init__(self, retry_in):
+        Exception.__init__(self, f"Cricbuzz API circuit open; retrying upstream in {retry_in:.1f}s")
+        self.status = None
+        self.retry_in = retry_in
+
+
+def default_headers():
+    return {"x-rapidapi-host": API_HOST, "x-rapidapi-key": os.getenv("RAPIDAPI_KEY", "")}
+
+
+def base_url():
+    # Read at call time so a .env loaded by the caller is honoured
+    return os.getenv("CRICBUZZ_BASE_URL", DEFAULT_BASE_URL).rstrip("/")
+
+
+def endpoint_name(path):
+    """/mcenter/v1/12345/scard?x=1 -> /mcenter/v1/{id}/scard, so stats group by endpoint."""
+    return re.sub(r"/\d+(?=/|$)", "/{id}", path.split("?", 1)[0])
+
+
+class CircuitBreaker:
+    """Stop calling an upstream that keeps failing.
+
+    After `threshold` consecutive failed attempts the circuit opens and calls
+    fail fast for `reset_after` seconds; then a single trial call is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold=5, reset_after=30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self._opened_at >= self.reset_after else "open"
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go upstream now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            waited = time.monotonic() - self._opened_at
+            if waited >= self.reset_after and not self._trial:
+                self._trial = True
+                return
+            raise CircuitOpenError(max(0.0, self.reset_after - waited))
+
+    @contextmanager
+    def attempt(self):
+        """Check the circuit, then settle it with the outcome of one upstream call.
+
+        The block succeeding, or raising an ApiError for a non-retryable
+        status (a 4xx is about the request, not the upstream), counts as a
+        success; any other exception counts as a failure. Every attempt thus
+        ends a half-open trial one way or the other.
+        """
+        self.check()
+        try:
+            yield
+        except ApiError as e:
+            if e.status in RETRY_STATUSES:
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            self.record_failure()
+            raise
+        else:
+            self.record_success()
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or (self._opened_at is None and self._failures >= self.threshold):
+                log.warning("Cricbuzz API circuit opened after %d failures", self._failures)
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+
+class LatencyStats:
+    """Per-endpoint call counts and a window of recent latencies."""
+
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+        self._counts = defaultdict(lambda: {"calls": 0, "errors": 0, "retries": 0})
+
+    @contextmanager
+    def timed(self, path, retry=False):
+        """Record the duration of the block; it sets call.ok when the call succeeded."""
+        call = SimpleNamespace(ok=False)
+        start = time.perf_counter()
+        try:
+            yield call
+        finally:
+            self.record(path, time.perf_counter() - start, call.ok, retry=retry)
+
+    def record(self, path, seconds, ok, retry=False):
+        endpoint = endpoint_name(path)
+        with self._lock:
+            self._latencies[endpoint].append(seconds * 1000)
+            counts = self._counts[endpoint]
+            counts["calls"] += 1
+            counts["errors"] += not ok
+            counts["retries"] += retry
+
+    def summary(self):
+        with self._lock:
+            out = {}
+            for endpoint, samples in self._latencies.items():
+                ordered = sorted(samples)
+                out[endpoint] = dict(
+                    self._counts[endpoint],
+                    p50_ms=round(ordered[len(ordered) // 2], 1),
+                    p95_ms=round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+                    max_ms=round(ordered[-1], 1),
+                )
+            return out
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter that honours Retry-After.
+
+    Shared by the blocking client and the async fetcher, so every caller
+    backs off the same way.
+    """
+
+    def __init__(self, max_retries=3, backoff=0.5, max_backoff=8.0):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        return delay
+
+
+# Shared by every client and the async fetcher in this process
+retry_policy = RetryPolicy(
+    max_retries=int(os.getenv("RAPIDAPI_MAX_RETRIES", "3")),
+    backoff=float(os.getenv("RAPIDAPI_BACKOFF", "0.5")),
+    max_backoff=float(os.getenv("RAPIDAPI_MAX_BACKOFF", "8")),
+)
+breaker = CircuitBreaker(
+    threshold=int(os.getenv("RAPIDAPI_BREAKER_THRESHOLD", "5")),
+    reset_after=float(os.getenv("RAPIDAPI_BREAKER_RESET", "30")),
+)
+latency = LatencyStats()
+
+
+class CricbuzzClient:
+    """Blocking Cricbuzz API client: one keep-alive Session, the process-wide
+    token bucket and retry policy, and the shared circuit breaker and
+    latency stats.
+    """
+
+    def __init__(self, policy=retry_policy, timeout=(3.05, 15), pool_size=16):
+        self.policy = policy
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(default_headers())
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, path, params=None, headers=None, timeout=None, retries=None, not_modified_ok=False):
+        """GET base_url + path and return the Response (200, or 304 when not_modified_ok).
+
+        Raises ApiError for non-retryable statuses, the last error once
+        retries are exhausted, and CircuitOpenError without calling upstream
+        while the circuit is open.
+        """
+        retries = self.policy.max_retries if retries is None else retries
+        url = base_url() + path
+        error = None
+        for attempt in range(retries + 1):
+            response = None
+            try:
+                with breaker.attempt():
+                    api_bucket.acquire()
+                    with latency.timed(path, retry=attempt > 0) as call:
+                        response = self.session.get(
+                            url, params=params, headers=headers, timeout=timeout or self.timeout
+                        )
+                        call.ok = response.status_code == 200 or (not_modified_ok and response.status_code == 304)
+                    if call.ok:
+                        return response
+                    raise ApiError(response.status_code, response.text, path)
+            except ApiError as e:
+                if e.status not in RETRY_STATUSES:
+                    raise
+                error = e
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            if attempt < retries:
+                delay = self.policy.delay(attempt, response.headers.get("Retry-After") if response is not None else None)
+                log.warning("Retrying %s in %.2fs after: %s", path, delay, error)
+                time.sleep(delay)
+        raise error
+
+    def get_json(self, path, params=None, **kwargs):
+        return self.get(path, params=params, **kwargs).json()
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def api_client():
+    """The process-wide client, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = CricbuzzClient()
+        return _client
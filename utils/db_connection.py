@@ -0,0 +1,182 @@
+import os
+import time
+import logging
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import QueuePool
+
+load_dotenv()
+
+log = logging.getLogger("db")
+
+DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+psycopg2://postgres@localhost:5432/cricbuzz_db")
+# The SQL analytics page runs against the tables.sql schema, whose teams,
+# players and matches differ from db.sql's, so it lives in its own database
+ANALYTICS_DATABASE_URL = os.getenv(
+    "ANALYTICS_DATABASE_URL", "postgresql+psycopg2://postgres@localhost:5432/cricbuzz_analytics"
+)
+DATABASE_URLS = {
+    "main": DATABASE_URL,
+    "analytics": ANALYTICS_DATABASE_URL,
+}
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", str(POOL_SIZE)))
+
+# statement_timeout per caller role; "0" disables the limit
+STATEMENT_TIMEOUTS = {
+    "dashboard": os.getenv("DB_TIMEOUT_DASHBOARD", "5s"),
+    "analytics": os.getenv("DB_TIMEOUT_ANALYTICS", "30s"),
+    "etl": os.getenv("DB_TIMEOUT_ETL", "0"),
+}
+
+
+class PoolMetrics:
+    """Checkout counts and wait times for one database's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.failures = 0
+        self.connects = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_checkout(self, wait):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self, pool):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "failures": self.failures,
+                "new_connections": self.connects,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+            }
+
+
+metrics = {database: PoolMetrics() for database in DATABASE_URLS}
+
+
+def _build_engine(database):
+    engine = create_engine(
+        DATABASE_URLS[database],
+        poolclass=QueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics[database].record_connect()
+
+    _prewarm(engine, min(POOL_PREWARM, POOL_SIZE))
+    log.info("🔌 Pooled %s engine ready (size=%d, overflow=%d)", database, POOL_SIZE, MAX_OVERFLOW)
+    return engine
+
+
+def _prewarm(engine, count):
+    """Open `count` connections up front so the first reruns skip TCP/TLS and auth."""
+    if count <= 0:
+        return
+
+    def checkout(_):
+        try:
+            return engine.connect()
+        except Exception as e:
+            log.warning("Pool pre-warm failed: %s", e)
+            return None
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        conns = list(pool.map(checkout, range(count)))
+    for conn in conns:
+        if conn is not None:
+            conn.close()
+
+
+try:
+    import streamlit as st
+    from streamlit import runtime
+except ImportError:
+    st = runtime = None
+
+if st is not None:
+    @st.cache_resource(show_spinner=False)
+    def _streamlit_engine(database):
+        return _build_engine(database)
+
+
+@lru_cache(maxsize=None)
+def _process_engine(database):
+    return _build_engine(database)
+
+
+def get_engine(database="main"):
+    """The process-wide engine of a database: cached with st.cache_resource under Streamlit."""
+    if database not in DATABASE_URLS:
+        raise ValueError(f"Unknown database {database!r}; expected one of {', '.join(DATABASE_URLS)}")
+    if runtime is not None and runtime.exists():
+        return _streamlit_engine(database)
+    return _process_engine(database)
+
+
+def _apply_timeout(conn, role):
+    timeout = STATEMENT_TIMEOUTS.get(role, STATEMENT_TIMEOUTS["dashboard"])
+    info = conn.connection.info
+    # Session setting survives the return to the pool, so only send it when the role changes
+    if info.get("statement_timeout") != timeout:
+        conn.execute(text("SELECT set_config('statement_timeout', :t, false)"), {"t": timeout})
+        conn.commit()
+        info["statement_timeout"] = timeout
+
+
+def get_connection(role="dashboard", database="main"):
+    """Borrow a pooled connection (close() returns it); None when the database is unreachable.
+
+    database is "main" (db.sql: ETL, dashboard, live and CRUD pages) or
+    "analytics" (tables.sql: SQL analytics page and scorecards).
+    """
+    try:
+        engine = get_engine(database)
+        start = time.perf_counter()
+        conn = engine.connect()
+        metrics[database].record_checkout(time.perf_counter() - start)
+        try:
+            _apply_timeout(conn, role)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+    except Exception as e:
+        if database in metrics:
+            metrics[database].record_failure()
+        log.error("❌ Database connection failed: %s", e)
+        return None
+
+
+def pool_stats(database="main"):
+    return metrics[database].snapshot(get_engine(database).pool)
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+
+log = logging.getLogger("api_cache")
+
+CACHE_PATH = os.getenv("API_CACHE_PATH", os.path.join(".cache", "cricbuzz_api.sqlite"))
+MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "2000"))
+
+# Seconds a response stays fresh, per endpoint path
+ENDPOINT_TTLS = {
+    "/stats/v1/topstats": 24 * 3600,
+    "/stats/v1/topstats/0": 15 * 60,
+}
+DEFAULT_TTL = 300
+
+# How long one process may hold the right to refresh a key before others give up waiting
+LEASE_SECONDS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def _json_dumps(value):
+    return json.dumps(value, separators=(",", ":"))
+
+
+class DiskCache:
+    """TTL + LRU cache of JSON API responses in a WAL-mode SQLite file.
+
+    The file is shared by every session and every worker process. Misses
+    are single-flight: threads of one process wait on a per-key lock, and
+    processes coordinate through a lease row, so concurrent requests for
+    the same key cause one upstream call. Values are JSON unless other
+    dumps/loads functions are given.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, dumps=_json_dumps, loads=json.loads):
+        self.path = path
+        self.max_entries = max_entries
+        self.dumps = dumps
+        self.loads = loads
+        self._local = threading.local()
+        self._locks = {}  # key -> [lock, threads holding or waiting for it]
+        self._locks_guard = threading.Lock()
+        self._owner = uuid.uuid4().hex
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _key_lock(self, key):
+        # Dropped when its last user leaves, so keys that are never asked for
+        # again (e.g. superseded data versions) do not pile up
+        with self._locks_guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+    @staticmethod
+    def make_key(endpoint, params=None):
+        return endpoint + "?" + json.dumps(params or {}, sort_keys=True, separators=(",", ":"))
+
+    def get(self, key):
+        """Fresh cached value for key, or None."""
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute("SELECT value FROM entries WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        return self.loads(row[0])
+
+    def put(self, key, endpoint, value, ttl):
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT INTO entries (key, endpoint, value, expires_at, last_access) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at, "
+            "last_access = excluded.last_access",
+            (key, endpoint, self.dumps(value), now + ttl, now),
+        )
+        # LRU bound: drop the least recently read entries beyond max_entries
+        conn.execute(
+            "DELETE FROM entries WHERE key IN ("
+            "SELECT key FROM entries ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def _acquire_lease(self, key):
+        conn = self._conn()
+        now = time.time()
+        cursor = conn.execute(
+            "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at <= ?",
+            (key, self._owner, now + LEASE_SECONDS, now),
+        )
+        return cursor.rowcount == 1
+
+    def _release_lease(self, key):
+        self._conn().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self._owner))
+
+    def get_or_fetch(self, endpoint, params, fetch, ttl=None):
+        """Return the cached response for (endpoint, params), calling fetch() once on a miss.
+
+        fetch() must return a JSON-serialisable payload and raise on failure;
+        failures are never cached.
+        """
+        key = self.make_key(endpoint, params)
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._key_lock(key):
+            # Another thread of this process may have filled it while we waited
+            value = self.get(key)
+            if value is not None:
+                return value
+
+            deadline = time.time() + LEASE_SECONDS
+            while not self._acquire_lease(key):
+                # Another process is fetching this key; wait for its result
+                time.sleep(0.1)
+                value = self.get(key)
+                if value is not None:
+                    return value
+                if time.time() > deadline:
+                    log.warning("Lease wait for %s timed out; fetching anyway", key)
+                    break
+
+            try:
+                value = fetch()
+                self.put(key, endpoint, value, ENDPOINT_TTLS.get(endpoint, DEFAULT_TTL) if ttl is None else ttl)
+                return value
+            finally:
+                self._release_lease(key)
+
+    def invalidate(self, endpoint=None):
+        """Drop every entry for one endpoint, or the whole cache."""
+        if endpoint is None:
+            self._conn().execute("DELETE FROM entries")
+        else:
+            self._conn().execute("DELETE FROM entries WHERE endpoint = ?", (endpoint,))
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def api_cache():
+    """The process-wide cache over CACHE_PATH, opened on first use."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = DiskCache()
+        return _shared
@@ -0,0 +1,187 @@
+import json
+import select
+import logging
+import threading
+from collections import OrderedDict
+from sqlalchemy import text
+from utils.db_connection import get_connection
+from utils.change_events import listen_connection
+
+log = logging.getLogger("key_cache")
+
+
+class KeyCache:
+    """Bounded, thread-safe name -> surrogate key cache for a dimension table.
+
+    The cache is warmed once from the database the first time it is used and
+    kept current by callers via put()/invalidate().
+    """
+
+    def __init__(self, table, name_col, id_col, maxsize=5000, name_type="text"):
+        self.table = table
+        self.name_col = name_col
+        self.id_col = id_col
+        self.maxsize = maxsize
+        self.name_type = name_type
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._warmed = False
+
+    def warm(self, conn):
+        rows = conn.execute(
+            text(f"SELECT {self.name_col}, {self.id_col} FROM {self.table} LIMIT :n"),
+            {"n": self.maxsize},
+        ).fetchall()
+        with self._lock:
+            for name, key in rows:
+                self._store(name, key)
+            self._warmed = True
+
+    def get(self, name):
+        with self._lock:
+            key = self._entries.get(name)
+            if key is not None:
+                self._entries.move_to_end(name)
+            return key
+
+    def put(self, name, key):
+        with self._lock:
+            self._store(name, key)
+
+    def invalidate(self, name=None):
+        """Drop one entry, or every entry when no name is given."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                self._warmed = False
+            else:
+                self._entries.pop(name, None)
+
+    def resolve(self, conn, names):
+        """Return {name: key} for the names that exist, querying only cache misses."""
+        if not self._warmed:
+            self.warm(conn)
+
+        found, missing = {}, []
+        for name in names:
+            key = self.get(name)
+            if key is None:
+                missing.append(name)
+            else:
+                found[name] = key
+
+        if missing:
+            rows = conn.execute(
+                text(f"SELECT {self.name_col}, {self.id_col} FROM {self.table} "
+                     f"WHERE {self.name_col} = ANY(:names)"),
+                {"names": missing},
+            ).fetchall()
+            with self._lock:
+                for name, key in rows:
+                    self._store(name, key)
+                    found[name] = key
+        return found
+
+    def ensure(self, conn, names, columns=None):
+        """Like resolve(), but first inserts the names that do not exist yet.
+
+        columns maps each other column to write to {name: value}, for
+        tables with NOT NULL columns besides the name; without it only the
+        name column is written. Inserted keys are cached before the caller
+        commits, so callers invalidate() on rollback and must not share the
+        cache with other open transactions meanwhile.
+        """
+        found = self.resolve(conn, names)
+        missing = [n for n in names if n not in found]
+        if missing:
+            columns = columns or {}
+            cols = list(columns)
+            arrays = "".join(f", CAST(:c{i} AS text[])" for i in range(len(cols)))
+            params = {"names": missing}
+            params.update({f"c{i}": [columns[c].get(n) for n in missing] for i, c in enumerate(cols)})
+            rows = conn.execute(
+                text(f"INSERT INTO {self.table} ({', '.join([self.name_col] + cols)}) "
+                     f"SELECT * FROM unnest(CAST(:names AS {self.name_type}[]){arrays}) "
+                     f"ON CONFLICT ({self.name_col}) DO NOTHING "
+                     f"RETURNING {self.name_col}, {self.id_col}"),
+                params,
+            ).fetchall()
+            with self._lock:
+                for name, key in rows:
+                    self._store(name, key)
+                    found[name] = key
+            # Rows inserted concurrently by another writer come back through a SELECT
+            found.update(self.resolve(conn, [n for n in missing if n not in found]))
+        return found
+
+    def _store(self, name, key):
+        self._entries[name] = key
+        self._entries.move_to_end(name)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+# Process-wide caches shared by the ETL and the Streamlit pages
+team_ids = KeyCache("teams", "team_name", "team_id")
+venue_ids = KeyCache("venues", "venue_name", "venue_id")
+player_ids = KeyCache("players", "name", "player_id", maxsize=20000)
+
+# The same tables in the analytics database (tables.sql), written by the scorecard loader;
+# players there are keyed on their Cricbuzz id, as names are not unique
+analytics_team_ids = KeyCache("teams", "team_name", "team_id")
+analytics_player_ids = KeyCache("players", "cricbuzz_player_id", "player_id", maxsize=20000, name_type="bigint")
+
+# Main-database caches by the table they map, for invalidation from change notifications
+CACHES_BY_TABLE = {"teams": team_ids, "venues": venue_ids, "players": player_ids}
+
+
+def _invalidate_tables(tables):
+    for table in tables:
+        cache = CACHES_BY_TABLE.get(table)
+        if cache is not None:
+            cache.invalidate()
+
+
+def _listen(stop, source):
+    while not stop.is_set():
+        conn = None
+        try:
+            conn = get_connection(role="etl")
+            if not conn:
+                raise RuntimeError("DB connection failed")
+            raw = listen_connection(conn)
+            # Notifications sent while we were disconnected are lost, so start over
+            _invalidate_tables(CACHES_BY_TABLE)
+
+            while not stop.is_set():
+                if select.select([raw], [], [], 5) == ([], [], []):
+                    continue
+                raw.poll()
+                while raw.notifies:
+                    notify = raw.notifies.pop(0)
+                    try:
+                        message = json.loads(notify.payload)
+                    except ValueError:
+                        _invalidate_tables(CACHES_BY_TABLE)
+                        continue
+                    # Our own writes only add names, which the caches pick up on a miss
+                    if message.get("source") != source:
+                        _invalidate_tables(message.get("tables", []))
+        except Exception as e:
+            log.warning("Key cache listener disconnected: %s", e)
+            stop.wait(5)
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def start_invalidation_listener(stop, source="etl"):
+    """Invalidate this process's key caches when another process changes their tables.
+
+    Caches are per process, so renames and deletes made elsewhere (e.g. the
+    CRUD page) reach a long-running process only through the NOTIFY channel.
+    Runs in a daemon thread until stop is set.
+    """
+    thread = threading.Thread(target=_listen, args=(stop, source), name="key-cache-listener", daemon=True)
+    thread.start()
+    return thread
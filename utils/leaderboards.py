@@ -0,0 +1,150 @@
+import json
+import pandas as pd
+from sqlalchemy import text
+from utils.key_cache import player_ids
+from utils.change_events import notify_change
+
+FORMATS = ["test", "odi", "t20"]
+STAT_TYPES_PATH = "/stats/v1/topstats"
+LEADERBOARD_PATH = "/stats/v1/topstats/0"
+
+
+def stats_table(category):
+    return "bowling_stats" if "bowling" in category.lower() else "batting_stats"
+
+
+def parse_stat_types(payload):
+    """Flatten a /stats/v1/topstats payload into [{value, label, category}]."""
+    return [
+        {"value": t["value"], "label": t["header"], "category": t["category"]}
+        for category in payload.get("statsTypesList", [])
+        for t in category["types"]
+    ]
+
+
+def parse_leaderboard(data):
+    """Return (headers, rows) of a leaderboard payload, padding headers to the row width."""
+    headers = list(data.get("headers", []))
+    rows = [p["values"] for p in data.get("values", [])]
+    # Fix header/value mismatch
+    if rows and len(headers) < len(rows[0]):
+        headers += [f"Extra_{i}" for i in range(len(headers), len(rows[0]))]
+    return headers, rows
+
+
+def _as_int(series):
+    """Whole numbers as ints; anything int() would reject becomes 0."""
+    numbers = pd.to_numeric(series, errors="coerce")
+    return numbers.where(numbers % 1 == 0).fillna(0).astype("int64")
+
+
+def player_stats_frame(headers, rows):
+    """Vectorised (name, matches, value) per player of a leaderboard.
+
+    matches comes from the last "Mat"/"Matches" column and value from the
+    second column (usually the main stat), with "*" and thousands
+    separators stripped. Players listed twice keep their last row.
+    """
+    df = pd.DataFrame(rows, columns=headers)
+    out = pd.DataFrame({"name": df.iloc[:, 0]})
+
+    match_cols = [i for i, col in enumerate(headers) if "Mat" in col or "Matches" in col]
+    out["matches"] = _as_int(df.iloc[:, match_cols[-1]]) if match_cols else 0
+
+    if len(headers) > 1 and 1 not in match_cols:
+        cleaned = df.iloc[:, 1].astype(str).str.replace("*", "", regex=False).str.replace(",", "", regex=False)
+        out["value"] = _as_int(cleaned)
+    else:
+        out["value"] = None
+    return out.dropna(subset=["name"]).drop_duplicates("name", keep="last")
+
+
+def save_player_stats(conn, category, format_type, stat_type, headers, rows):
+    """Upsert the players of a leaderboard and their stat into batting/bowling_stats.
+
+    Runs as one statement (one round trip) whatever the leaderboard size:
+    a multi-row players upsert returning ids feeds a multi-row stats upsert.
+    Queues a change notification; the caller commits. Returns the number of
+    stat rows written.
+    """
+    table = stats_table(category)
+    frame = player_stats_frame(headers, rows)
+    if frame.empty:
+        return 0
+
+    result = conn.execute(
+        text(f"""
+        WITH v AS (
+            SELECT * FROM unnest(CAST(:names AS text[]), CAST(:matches AS int[]), CAST(:vals AS int[]))
+                AS v(name, matches, value)
+        ),
+        p AS (
+            INSERT INTO players (name, matches)
+            SELECT name, matches FROM v
+            ON CONFLICT (name) DO UPDATE SET
+                matches = COALESCE(EXCLUDED.matches, players.matches)
+            RETURNING player_id, name
+        ),
+        s AS (
+            INSERT INTO {table} (player_id, format, stat_type, value, matches)
+            SELECT p.player_id, :fmt, :stat, v.value, v.matches
+            FROM p JOIN v USING (name)
+            WHERE v.value IS NOT NULL
+            ON CONFLICT (player_id, format, stat_type) DO UPDATE
+            SET value = EXCLUDED.value, matches = EXCLUDED.matches
+            RETURNING 1
+        )
+        SELECT p.name, p.player_id, (SELECT count(*) FROM s) AS saved FROM p
+        """),
+        {
+            "names": frame["name"].astype(str).tolist(),
+            "matches": frame["matches"].tolist(),
+            "vals": [None if pd.isna(v) else int(v) for v in frame["value"]],
+            "fmt": format_type,
+            "stat": stat_type,
+        },
+    ).fetchall()
+
+    saved_count = 0
+    for name, player_id, saved in result:
+        player_ids.put(name, player_id)
+        saved_count = saved
+
+    notify_change(conn, ["players", table], source="top_stats")
+    return saved_count
+
+
+def store_leaderboard(conn, stat, format_type, data):
+    """Persist a full leaderboard and its player stats; the caller commits."""
+    headers, rows = parse_leaderboard(data)
+    conn.execute(
+        text("""
+        INSERT INTO leaderboards (format, stat_type, category, label, headers, rows, fetched_at)
+        VALUES (:fmt, :stat, :category, :label, CAST(:headers AS jsonb), CAST(:rows AS jsonb), now())
+        ON CONFLICT (format, stat_type) DO UPDATE
+        SET category = EXCLUDED.category, label = EXCLUDED.label, headers = EXCLUDED.headers,
+            rows = EXCLUDED.rows, fetched_at = EXCLUDED.fetched_at
+        """),
+        {"fmt": format_type, "stat": stat["value"], "category": stat["category"], "label": stat["label"],
+         "headers": json.dumps(headers), "rows": json.dumps(rows)},
+    )
+    saved = save_player_stats(conn, stat["category"], format_type, stat["value"], headers, rows)
+    notify_change(conn, ["leaderboards"], source="prefetch")
+    return saved
+
+
+def read_stat_types(conn):
+    """Stat types that have a stored leaderboard, in the shape of parse_stat_types()."""
+    rows = conn.execute(text(
+        "SELECT DISTINCT stat_type, label, category FROM leaderboards ORDER BY category, label"
+    )).fetchall()
+    return [{"value": v, "label": label, "category": category} for v, label, category in rows]
+
+
+def read_leaderboard(conn, format_type, stat_type):
+    """(headers, rows, fetched_at) of a stored leaderboard, or None."""
+    row = conn.execute(
+        text("SELECT headers, rows, fetched_at FROM leaderboards WHERE format = :fmt AND stat_type = :stat"),
+        {"fmt": format_type, "stat": stat_type},
+    ).fetchone()
+    return tuple(row) if row else None
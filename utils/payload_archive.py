@@ -0,0 +1,73 @@
+import os
+import re
+import glob
+import gzip
+import heapq
+import json
+import threading
+from datetime import datetime, timezone
+
+ARCHIVE_DIR = os.getenv("ETL_ARCHIVE_DIR", "archive")
+
+_lock = threading.Lock()
+
+
+def archive_payload(endpoint, payload, fetched_at=None, root=ARCHIVE_DIR):
+    """Append one API response to <root>/YYYY/MM/DD/<endpoint>.jsonl.gz.
+
+    Each append is its own gzip member, which gzip readers concatenate
+    transparently. Match ids are dropped from the file name so that, for
+    example, every scorecard of a day lands in one file.
+    """
+    if not root:
+        return
+    fetched_at = fetched_at or datetime.now(timezone.utc)
+    day_dir = os.path.join(root, fetched_at.strftime("%Y"), fetched_at.strftime("%m"), fetched_at.strftime("%d"))
+    name = re.sub(r"/\d+", "", endpoint).strip("/").replace("/", "_")
+    line = json.dumps(
+        {"fetched_at": fetched_at.isoformat(), "endpoint": endpoint, "payload": payload},
+        separators=(",", ":"),
+    )
+    with _lock:
+        os.makedirs(day_dir, exist_ok=True)
+        with gzip.open(os.path.join(day_dir, f"{name}.jsonl.gz"), "at", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _fetched_at(line):
+    """Sort key of an archived line; fetched_at is the first key archive_payload() writes."""
+    prefix = '{"fetched_at":"'
+    if line.startswith(prefix):
+        value = line[len(prefix):line.index('"', len(prefix))]
+    else:
+        value = json.loads(line)["fetched_at"]
+    fetched_at = datetime.fromisoformat(value)
+    return fetched_at if fetched_at.tzinfo else fetched_at.replace(tzinfo=timezone.utc)
+
+
+def _read_lines(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        yield from f
+
+
+def iter_archive_lines(root=ARCHIVE_DIR):
+    """Stream the raw JSON lines of every archive file under root in fetched_at order.
+
+    Days are read oldest first, and the files of one day (one per endpoint)
+    are merged on fetched_at, so a replay applies payloads in the order they
+    were fetched rather than in file-name order. Each file is already in
+    append order, which is fetch order.
+    """
+    days = {}
+    for path in glob.glob(os.path.join(root, "**", "*.jsonl.gz"), recursive=True):
+        days.setdefault(os.path.dirname(path), []).append(path)
+    for day in sorted(days):
+        yield from heapq.merge(*(_read_lines(p) for p in sorted(days[day])), key=_fetched_at)
+
+
+def iter_archive(root=ARCHIVE_DIR, endpoint_prefix=""):
+    """Stream archived records ({fetched_at, endpoint, payload}) in fetched_at order."""
+    for line in iter_archive_lines(root):
+        record = json.loads(line)
+        if record["endpoint"].startswith(endpoint_prefix):
+            yield record
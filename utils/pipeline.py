@@ -0,0 +1,120 @@
+import time
+import queue
+import logging
+import threading
+
+log = logging.getLogger("etl")
+
+_DONE = object()
+
+
+class StageStats:
+    """Item count and time split for one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.waiting = 0.0
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def report(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        busy = max(elapsed - self.waiting, 0.0)
+        log.info("📊 %-10s %7d items in %.2fs (%.2fs busy, %.2fs waiting) → %.0f items/s",
+                 self.name, self.items, elapsed, busy, self.waiting,
+                 self.items / elapsed if elapsed else 0)
+
+
+class _Aborted(Exception):
+    pass
+
+
+def _put(q, item, abort, stats):
+    start = time.perf_counter()
+    while not abort.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            stats.waiting += time.perf_counter() - start
+            return
+        except queue.Full:
+            continue
+    raise _Aborted()
+
+
+def _drain(q, abort, stats):
+    """Iterate a stage's input queue until the upstream stage finishes."""
+    while True:
+        start = time.perf_counter()
+        while True:
+            if abort.is_set():
+                raise _Aborted()
+            try:
+                item = q.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        stats.waiting += time.perf_counter() - start
+        if item is _DONE:
+            return
+        yield item
+
+
+def run_pipeline(source, stages, sink, queue_size=8):
+    """Run source -> stages... -> sink with one thread per stage and bounded queues.
+
+    source is an iterable (consumed on its own thread), each stage is a
+    generator function taking an iterator and yielding outputs, and sink is
+    called with every final output on the calling thread, so it can own the
+    database connection. Memory stays bounded by queue_size items per hop.
+    Returns the StageStats of every stage; the first stage error is re-raised.
+    """
+    abort = threading.Event()
+    errors = []
+    # functools.partial stages are named after the function they wrap
+    names = ["extract"] + [getattr(s, "func", s).__name__ for s in stages] + ["load"]
+    stats = [StageStats(n) for n in names]
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+
+    def run(index, items):
+        out, st = queues[index], stats[index]
+        try:
+            for item in items:
+                st.items += 1
+                _put(out, item, abort, st)
+            _put(out, _DONE, abort, st)
+        except _Aborted:
+            pass
+        except Exception as e:
+            errors.append(e)
+            abort.set()
+        finally:
+            st.finished = time.perf_counter()
+
+    threads = [threading.Thread(target=run, args=(0, source), name="etl-extract", daemon=True)]
+    for i, stage in enumerate(stages, start=1):
+        items = stage(_drain(queues[i - 1], abort, stats[i]))
+        threads.append(threading.Thread(target=run, args=(i, items), name=f"etl-{names[i]}", daemon=True))
+    for t in threads:
+        t.start()
+
+    load_stats = stats[-1]
+    try:
+        for item in _drain(queues[-1], abort, load_stats):
+            sink(item)
+            load_stats.items += 1
+    except _Aborted:
+        pass
+    except BaseException:
+        abort.set()
+        raise
+    finally:
+        load_stats.finished = time.perf_counter()
+        for t in threads:
+            t.join()
+
+    for st in stats:
+        st.report()
+    if errors:
+        raise errors[0]
+    return stats
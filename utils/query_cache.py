@@ -0,0 +1,260 @@
+import io
+import os
+import re
+import json
+import time
+import select
+import logging
+import threading
+from datetime import date
+from decimal import Decimal
+from collections import OrderedDict
+import pandas as pd
+from sqlalchemy import text
+from utils.db_connection import get_connection
+from utils.change_events import listen_connection
+from utils.disk_cache import DiskCache
+
+log = logging.getLogger("query_cache")
+
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", os.path.join(".cache", "query_results.sqlite"))
+MEMORY_BYTES = int(os.getenv("RESULT_CACHE_MEMORY_MB", "64")) * 1024 * 1024
+DISK_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "500"))
+
+# Entries are keyed on data versions and so never go stale; the TTL only
+# lets results for versions nobody asks about any more age out
+RESULT_TTL = 7 * 24 * 3600
+
+# Channel tables.sql's data_versions trigger notifies on
+VERSIONS_CHANNEL = "data_versions"
+
+_CTE = re.compile(r"(?:\bWITH(?:\s+RECURSIVE)?|,)\s+([A-Za-z_]\w*)\s+AS\s*\(", re.IGNORECASE)
+_TABLE = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_][\w.]*)", re.IGNORECASE)
+# EXTRACT(YEAR FROM col) and friends look like a FROM clause
+_FUNCTION_FROM = re.compile(r"\b(?:EXTRACT|SUBSTRING|TRIM|POSITION|OVERLAY)\s*\([^()]*\)", re.IGNORECASE)
+
+
+def source_tables(sql):
+    """Base tables a query reads: names after FROM/JOIN minus its own CTEs."""
+    body = _FUNCTION_FROM.sub("", sql)
+    ctes = {name.lower() for name in _CTE.findall(body)}
+    tables = {name.lower().split(".")[-1] for name in _TABLE.findall(body)}
+    return tuple(sorted(tables - ctes))
+
+
+def read_versions(conn, tables):
+    """{table: version} for the tables tracked in data_versions, in one query."""
+    rows = conn.execute(
+        text("SELECT table_name, version FROM data_versions WHERE table_name = ANY(:tables)"),
+        {"tables": list(tables)},
+    ).fetchall()
+    return dict(rows)
+
+
+def _portable(df):
+    """df with NUMERIC columns as floats and DATE columns as datetimes, which JSON keeps."""
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        values = df[col].dropna()
+        if values.empty:
+            continue
+        if isinstance(values.iloc[0], Decimal):
+            df[col] = df[col].astype(float)
+        elif isinstance(values.iloc[0], date):
+            df[col] = pd.to_datetime(df[col])
+    return df
+
+
+def _df_dumps(df):
+    return df.to_json(orient="table", index=False, date_format="iso")
+
+
+def _df_loads(value):
+    return pd.read_json(io.StringIO(value), orient="table")
+
+
+class VersionTracker:
+    """data_versions held in memory and kept current by the data_versions NOTIFY channel.
+
+    While the listener is connected, reads cost no query; until it connects,
+    or after it drops, they fall back to read_versions().
+    """
+
+    def __init__(self):
+        self._versions = {}
+        self._live = False
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._listen_forever, name="data-versions-listener", daemon=True)
+            self._thread.start()
+
+    def read(self, conn, tables):
+        """{table: version} for the tracked tables among tables."""
+        with self._lock:
+            if self._live:
+                return {t: self._versions[t] for t in tables if t in self._versions}
+        return read_versions(conn, tables)
+
+    def _update(self, table, version):
+        with self._lock:
+            # Notifications arrive in commit order, but never go backwards on a reload race
+            self._versions[table] = max(version, self._versions.get(table, 0))
+
+    def _listen_forever(self):
+        while True:
+            conn = None
+            try:
+                conn = get_connection(role="analytics", database="analytics")
+                if not conn:
+                    raise RuntimeError("analytics DB connection failed")
+                raw = listen_connection(conn, VERSIONS_CHANNEL)
+                # Read after LISTEN so no version committed in between is missed
+                with raw.cursor() as cursor:
+                    cursor.execute("SELECT table_name, version FROM data_versions")
+                    versions = dict(cursor.fetchall())
+                with self._lock:
+                    self._versions = versions
+                    self._live = True
+
+                while True:
+                    if select.select([raw], [], [], 30) == ([], [], []):
+                        continue
+                    raw.poll()
+                    while raw.notifies:
+                        message = json.loads(raw.notifies.pop(0).payload)
+                        self._update(message["table"], message["version"])
+            except Exception as e:
+                with self._lock:
+                    self._live = False
+                log.warning("Data versions listener disconnected: %s", e)
+                if conn is not None:
+                    conn.close()
+                time.sleep(5)
+
+
+class MemoryLRU:
+    """Thread-safe LRU of DataFrames bounded by their total in-memory size."""
+
+    def __init__(self, max_bytes=MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(df):
+        return int(df.memory_usage(index=True, deep=True).sum())
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, df):
+        size = self._size(df)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.used -= old[1]
+            self._entries[key] = (df, size)
+            self.used += size
+            while self.used > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.used -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.used = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class QueryResultCache:
+    """Analytics results keyed by query id, parameters and source-table versions.
+
+    A per-process LRU sits in front of a SQLite file shared by every session
+    and worker process; the file holds results as JSON, never pickles.
+    Writes to a source table bump its data_versions row, which changes the
+    key, so a result is reused until its inputs change.
+    """
+
+    def __init__(self, path=RESULT_CACHE_PATH, max_bytes=MEMORY_BYTES, max_entries=DISK_ENTRIES):
+        self.memory = MemoryLRU(max_bytes)
+        self.disk = DiskCache(path, max_entries, dumps=_df_dumps, loads=_df_loads)
+        self.versions = VersionTracker()
+        self._tables = {}
+        self.hits = self.misses = 0
+
+    def tables_for(self, query_id, sql):
+        tables = self._tables.get(query_id)
+        if tables is None:
+            tables = self._tables[query_id] = source_tables(sql)
+        return tables
+
+    def key(self, query_id, params, versions):
+        return json.dumps([query_id, params or {}, sorted(versions.items())], sort_keys=True, default=str)
+
+    def get_or_run(self, conn, query_id, sql, run, params=None):
+        """Return (df, hit): the cached result for the current data, or run(conn)'s.
+
+        Costs no query when the result is cached and the versions listener
+        is connected. Failures from run() propagate and are never cached.
+        """
+        versions = self.versions.read(conn, self.tables_for(query_id, sql))
+        key = self.key(query_id, params, versions)
+
+        df = self.memory.get(key)
+        if df is not None:
+            self.hits += 1
+            return df, True
+
+        ran = []
+
+        def fetch():
+            ran.append(True)
+            # Converted before caching so fresh, memory and disk results are alike
+            return _portable(run(conn))
+
+        df = self.disk.get_or_fetch(f"query:{query_id}", {"key": key}, fetch, ttl=RESULT_TTL)
+        self.memory.put(key, df)
+        if ran:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return df, not ran
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self.memory),
+            "memory_mb": round(self.memory.used / 1024 / 1024, 2),
+        }
+
+    def invalidate(self):
+        self.memory.clear()
+        self.disk.invalidate()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def result_cache():
+    """The process-wide result cache, opened on first use."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = QueryResultCache()
+            _shared.versions.start()
+        return _shared
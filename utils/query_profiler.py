@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from statistics import median
+from sqlalchemy import text
+
+PLAN_HISTORY_PATH = os.getenv("PLAN_HISTORY_PATH", os.path.join(".cache", "plan_history.sqlite"))
+
+# A run regresses when it is this many times slower than the median of the
+# previous runs and slower by more than the noise floor
+RUNTIME_REGRESSION_FACTOR = float(os.getenv("PLAN_REGRESSION_FACTOR", "1.5"))
+RUNTIME_NOISE_MS = 5.0
+HISTORY_WINDOW = 10
+
+# Nodes that take at least this share of the execution time are highlighted
+HOT_SHARE = 0.2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plan_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    query_id TEXT NOT NULL,
+    run_at REAL NOT NULL,
+    shape TEXT NOT NULL,
+    planning_ms REAL NOT NULL,
+    execution_ms REAL NOT NULL,
+    total_ms REAL NOT NULL,
+    flags TEXT NOT NULL,
+    plan TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_plan_runs_query ON plan_runs (query_id, run_at);
+"""
+
+
+def explain_analyze(conn, sql):
+    """Run sql under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) and return the top-level plan document."""
+    raw = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql.strip().rstrip(';')}")).scalar()
+    if isinstance(raw, str):
+        raw = json.loads(raw)
+    return raw[0]
+
+
+def _node_label(node):
+    # Join Type is only set on join nodes
+    if node.get("Join Type"):
+        return f"{node['Join Type']} {node['Node Type']}"
+    return node["Node Type"]
+
+
+def _shape(node):
+    parts = [_node_label(node), node.get("Relation Name", ""), node.get("Index Name", "")]
+    return "(" + " ".join(p for p in parts if p) + "".join(_shape(c) for c in node.get("Plans", [])) + ")"
+
+
+def plan_shape(document):
+    """Hash of the plan's node types, joins, relations and indexes; ignores costs and timings."""
+    return hashlib.sha1(_shape(document["Plan"]).encode()).hexdigest()[:12]
+
+
+def _wall_loops(node, processes):
+    # Under a Gather, loops counts every worker and the leader, each reporting its
+    # own average, so only the loops beyond one per process add wall time
+    loops = node.get("Actual Loops", 1) or 1
+    return max(loops / processes, 1.0)
+
+
+def plan_nodes(document):
+    """Flatten the plan into rows in tree order with inclusive and self times.
+
+    Actual Total Time is per loop, so both are scaled by Loops; below a
+    Gather the loops of the parallel processes run side by side and are
+    not added up. Self time is what is left after subtracting the children.
+    """
+    execution = document.get("Execution Time") or 0.0
+    rows = []
+
+    def walk(node, depth, processes):
+        loops = node.get("Actual Loops", 1) or 1
+        inclusive = node.get("Actual Total Time", 0.0) * _wall_loops(node, processes)
+        children = node.get("Plans", [])
+        if "Workers Launched" in node:
+            # The workers plus the leader, which runs the plan below a Gather too by default
+            processes = node["Workers Launched"] + 1
+        child_time = sum(c.get("Actual Total Time", 0.0) * _wall_loops(c, processes) for c in children)
+        own = max(inclusive - child_time, 0.0)
+        rows.append({
+            "Node": "    " * depth + ("→ " if depth else "") + _node_label(node),
+            "On": node.get("Index Name") or node.get("Relation Name") or node.get("CTE Name") or "",
+            "Total (ms)": round(inclusive, 3),
+            "Self (ms)": round(own, 3),
+            "Share": round(own / execution, 3) if execution else 0.0,
+            "Rows": node.get("Actual Rows", 0) * loops,
+            "Est. Rows": node.get("Plan Rows", 0),
+            "Loops": loops,
+            "Shared Hit": node.get("Shared Hit Blocks", 0),
+            "Shared Read": node.get("Shared Read Blocks", 0),
+        })
+        for child in children:
+            walk(child, depth + 1, processes)
+
+    walk(document["Plan"], 0, 1)
+    return rows
+
+
+def hot_nodes(rows, top=3):
+    """Indexes of the most expensive nodes by self time, those above HOT_SHARE."""
+    ranked = sorted(range(len(rows)), key=lambda i: rows[i]["Self (ms)"], reverse=True)
+    return {i for i in ranked[:top] if rows[i]["Share"] >= HOT_SHARE}
+
+
+class PlanHistory:
+    """Plans and timings of profiled runs in a local SQLite file, with regression checks."""
+
+    def __init__(self, path=PLAN_HISTORY_PATH):
+        self.path = path
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def previous(self, query_id, limit=HISTORY_WINDOW):
+        """(shape, execution_ms) of the latest runs of a query, newest first."""
+        return self._conn().execute(
+            "SELECT shape, execution_ms FROM plan_runs WHERE query_id = ? ORDER BY run_at DESC LIMIT ?",
+            (str(query_id), limit),
+        ).fetchall()
+
+    def check(self, query_id, shape, execution_ms):
+        """Regression flags of a run against the earlier runs of the same query."""
+        earlier = self.previous(query_id)
+        if not earlier:
+            return []
+        flags = []
+        if shape != earlier[0][0]:
+            flags.append("plan changed")
+        baseline = median(ms for _, ms in earlier)
+        if execution_ms > baseline * RUNTIME_REGRESSION_FACTOR and execution_ms - baseline > RUNTIME_NOISE_MS:
+            flags.append(f"runtime {execution_ms / baseline:.1f}x the median of {baseline:.1f}ms")
+        return flags
+
+    def record(self, query_id, document, total_ms):
+        """Store one profiled run; returns (shape, flags)."""
+        shape = plan_shape(document)
+        execution_ms = document.get("Execution Time", 0.0)
+        flags = self.check(query_id, shape, execution_ms)
+        self._conn().execute(
+            "INSERT INTO plan_runs (query_id, run_at, shape, planning_ms, execution_ms, total_ms, flags, plan) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (str(query_id), time.time(), shape, document.get("Planning Time", 0.0), execution_ms,
+             total_ms, json.dumps(flags), json.dumps(document)),
+        )
+        return shape, flags
+
+    def runs(self, query_id, limit=20):
+        """Recent runs of a query, newest first, as dicts for display."""
+        rows = self._conn().execute(
+            "SELECT run_at, shape, planning_ms, execution_ms, total_ms, flags FROM plan_runs "
+            "WHERE query_id = ? ORDER BY run_at DESC LIMIT ?",
+            (str(query_id), limit),
+        ).fetchall()
+        return [
+            {"run_at": run_at, "shape": shape, "planning_ms": planning, "execution_ms": execution,
+             "total_ms": total, "flags": json.loads(flags)}
+            for run_at, shape, planning, execution, total, flags in rows
+        ]
+
+    def regressions(self):
+        """{query_id: flags} for queries whose latest profiled run was flagged."""
+        rows = self._conn().execute(
+            "SELECT query_id, flags FROM plan_runs p WHERE run_at = "
+            "(SELECT max(run_at) FROM plan_runs WHERE query_id = p.query_id)"
+        ).fetchall()
+        return {query_id: json.loads(flags) for query_id, flags in rows if flags != "[]"}
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def plan_history():
+    """The process-wide plan history, opened on first use."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PlanHistory()
+        return _shared
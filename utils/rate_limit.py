@@ -0,0 +1,37 @@
+import os
+import time
+import threading
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by sync and async callers.
+
+    reserve() never blocks: it takes the tokens immediately (letting the level
+    go negative) and returns how long the caller has to wait before using
+    them, so threads and event loops can each sleep in their own way.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, tokens=1):
+        time.sleep(self.reserve(tokens))
+
+
+# One bucket per process for every RapidAPI call, sized to the plan's quota
+api_bucket = TokenBucket(
+    rate=float(os.getenv("RAPIDAPI_RATE_PER_SEC", "5")),
+    capacity=int(os.getenv("RAPIDAPI_BURST", "10")),
+)